@@ -0,0 +1,53 @@
+"""
+Benchmark of the EventManager dispatch throughput.
+
+Measure how many `dispatch()` per second the EventManager can do with
+1, 10 and 100 subscribers on the same event, including running the callbacks.
+
+Run it from the repository root:
+    python -m benchmarks.events_dispatch
+"""
+
+import asyncio
+import time
+
+from phelper.events import EventManager
+
+DISPATCHES = 2_000
+SUBSCRIBERS = (1, 10, 100)
+
+
+def make_callback():
+    async def on_new_live(data: dict, notify: bool = True):
+        return data["id"]
+
+    return on_new_live
+
+
+async def bench(subscribers: int) -> float:
+    manager = EventManager(asyncio.get_running_loop())
+    manager.logger.disabled = True
+    for _ in range(subscribers):
+        manager.on("new live", make_callback())
+    payload = {"id": "GRObk6TBtBw", "title": "I, Tsushima - Episode 08 [Takarir Indonesia]"}
+    start = time.perf_counter()
+    for _ in range(DISPATCHES):
+        manager.dispatch("new live", payload)
+    # Let all of the callbacks finish
+    while len(asyncio.all_tasks()) > 1:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    await manager.close()
+    return elapsed
+
+
+async def main():
+    print(f"{'subscribers':>12} | {'dispatch/s':>12} | {'callbacks/s':>12}")
+    for subscribers in SUBSCRIBERS:
+        elapsed = await bench(subscribers)
+        callbacks_per_second = DISPATCHES * subscribers / elapsed
+        print(f"{subscribers:>12} | {DISPATCHES / elapsed:>12,.0f} | {callbacks_per_second:>12,.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark of the bot import time.
+
+Run `python -X importtime -c "import phelper"` in a fresh interpreter a few
+times, parse the report and print the slowest top-level modules.
+It exits with an error if one of the lazily imported dependencies got imported
+at startup again, or if the import took longer than `--max-ms`.
+
+Run it from the repository root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --max-ms 1500
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+RUNS = 5
+TOP = 15
+# These should only be imported when the feature is used
+LAZY_MODULES = ("wavelink", "pyppeteer", "PIL", "websockets")
+
+
+class ImportEntry(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportEntry]:
+    entries = []
+    for line in stderr.splitlines():
+        # import time:       self [us] |  cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        # Nested imports are indented by 2 spaces, after the space of the separator
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        entries.append(ImportEntry(module.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure(statement: str) -> List[ImportEntry]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        raise SystemExit(f"Failed to run `{statement}`")
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statement", default="import phelper")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the import took longer than this")
+    args = parser.parse_args()
+
+    # Use the fastest run of every module to reduce the noise
+    best: Dict[str, ImportEntry] = {}
+    totals = []
+    for _ in range(args.runs):
+        entries = measure(args.statement)
+        totals.append(sum(entry.cumulative_us for entry in entries if entry.depth == 0))
+        for entry in entries:
+            current = best.get(entry.module)
+            if current is None or entry.cumulative_us < current.cumulative_us:
+                best[entry.module] = entry
+
+    # The package itself and what it directly imports
+    top_level = sorted(
+        (entry for entry in best.values() if entry.depth <= 1), key=lambda x: x.cumulative_us, reverse=True
+    )
+    print(f"{'module':<40} | {'self':>10} | {'cumulative':>10}")
+    for entry in top_level[:TOP]:
+        print(f"{entry.module:<40} | {entry.self_us / 1000:>8.1f}ms | {entry.cumulative_us / 1000:>8.1f}ms")
+    total_ms = min(totals) / 1000
+    print(f"`{args.statement}`: {total_ms:.1f}ms (best of {args.runs})")
+
+    failed = False
+    eager = sorted({name.split(".")[0] for name in best.keys()} & set(LAZY_MODULES))
+    if eager:
+        print(f"Lazy modules imported at startup: {', '.join(eager)}", file=sys.stderr)
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Import took {total_ms:.1f}ms, more than the {args.max_ms:.1f}ms budget", file=sys.stderr)
+        failed = True
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
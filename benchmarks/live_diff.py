@@ -0,0 +1,114 @@
+"""
+Benchmark of the live state diffing in `FeedsYoutubeVideo._live_watcher`.
+
+Compare the old list-based diff (`in` checks against ID lists) with the
+keyed `diff_snapshots` on thousands of concurrent streams, where 10% of the
+streams ended, 10% started and 5% changed their title since the last run.
+
+Run it from the repository root:
+    python -m benchmarks.live_diff
+"""
+
+import random
+import time
+from typing import List, Tuple
+
+from cogs.feeds.video import LiveData
+from phelper.diff import diff_snapshots, key_by
+
+STREAMS = (100, 1_000, 5_000, 20_000)
+ITERATIONS = 5
+
+
+def make_live(index: int) -> LiveData:
+    return LiveData(
+        id=f"vid{index:08d}",
+        title=f"Anime Episode {index} [Takarir Indonesia]",
+        status="live",
+        start_time=1629481800 + index,
+        thumbnail=f"https://i.ytimg.com/vi/vid{index:08d}/maxresdefault.jpg",
+        platform="youtube",
+        channel="UCxxnxya_32jcKj4yN1_kD7A",
+        message_id=864018911884607508 + index,
+    )
+
+
+def make_snapshots(streams: int) -> Tuple[List[LiveData], List[LiveData]]:
+    rng = random.Random(streams)
+    posted = [make_live(idx) for idx in range(streams)]
+    ended = set(rng.sample(range(streams), streams // 10))
+    current = [make_live(idx) for idx in range(streams) if idx not in ended]
+    for live in rng.sample(current, streams // 20):
+        live.title += " (Re-upload)"
+    current.extend(make_live(idx) for idx in range(streams, streams + streams // 10))
+    rng.shuffle(current)
+    return posted, current
+
+
+def legacy_diff(posted: List[LiveData], current: List[LiveData]):
+    """The old `_live_watcher` diff, kept here for comparison."""
+    collected_posted_ids = [c.id for c in posted]
+    collected_lives_ids = [c.id for c in current]
+    need_to_be_deleted = []
+    need_to_be_posted = []
+    check_delete_later = []
+    for live_info in current:
+        if live_info.id not in collected_posted_ids:
+            need_to_be_posted.append(live_info)
+    for p_live_info in posted:
+        if p_live_info.id not in collected_lives_ids:
+            need_to_be_deleted.append(p_live_info)
+            check_delete_later.append(p_live_info.id)
+    collected_again = list(need_to_be_posted)
+    collected_again.extend(posted)
+    real_and_true = []
+    for c in collected_again:
+        if c.id not in check_delete_later:
+            real_and_true.append(c.serialize())
+    return need_to_be_posted, need_to_be_deleted, real_and_true
+
+
+def keyed_diff(posted: List[LiveData], current: List[LiveData]):
+    live_diff = diff_snapshots(
+        key_by(posted, lambda x: x.id), key_by(current, lambda x: x.id), LiveData.same_content
+    )
+    collected_again = list(live_diff.added)
+    collected_again.extend(new for _, new in live_diff.changed)
+    collected_again.extend(live_diff.unchanged)
+    return live_diff, [c.serialize() for c in collected_again]
+
+
+def bench(func, posted: List[LiveData], current: List[LiveData]) -> float:
+    best = float("inf")
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        func(posted, current)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'streams':>8} | {'legacy':>10} | {'keyed':>10} | {'speedup':>8} | {'changed':>8}")
+    for streams in STREAMS:
+        posted, current = make_snapshots(streams)
+        legacy_posted, legacy_deleted, _ = legacy_diff(posted, current)
+        live_diff, _ = keyed_diff(posted, current)
+        assert {x.id for x in legacy_posted} == {x.id for x in live_diff.added}
+        assert {x.id for x in legacy_deleted} == {x.id for x in live_diff.removed}
+
+        keyed = bench(keyed_diff, posted, current)
+        # The legacy diff is quadratic, dont wait forever on the biggest run
+        if streams > 5_000:
+            print(
+                f"{streams:>8} | {'-':>10} | {keyed * 1000:>8.1f}ms | {'-':>8} | {len(live_diff.changed):>8}"
+            )
+            continue
+        legacy = bench(legacy_diff, posted, current)
+        print(
+            f"{streams:>8} | {legacy * 1000:>8.1f}ms | {keyed * 1000:>8.1f}ms | "
+            f"{legacy / keyed:>7.1f}x | {len(live_diff.changed):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
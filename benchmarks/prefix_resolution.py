@@ -0,0 +1,119 @@
+"""
+Benchmark of the command prefix resolution.
+
+Compare the old `prefixes_with_data` (isinstance ladder, new list and
+mention formatting on every message) with the precomputed `PrefixTable`
+that the bot now use as the `command_prefix`.
+
+Run it from the repository root:
+    python -m benchmarks.prefix_resolution
+"""
+
+import time
+import typing as T
+
+import discord
+from discord.ext import commands
+
+from phelper.utils import PrefixTable
+
+ITERATIONS = 200_000
+GUILDS = 1_000
+
+
+def prefixes_with_data(
+    bot,
+    context: T.Union[discord.Message, discord.TextChannel, discord.Guild, commands.Context],
+    prefixes_data: dict,
+    default: str,
+) -> list:
+    """The old `phelper.utils.prefixes_with_data`, kept here for comparison."""
+    pre_data = []
+    pre_data.append(default)
+
+    guild: discord.Guild = None
+    if isinstance(context, (discord.Message, discord.TextChannel)):
+        if hasattr(context, "guild"):
+            try:
+                guild = context.guild
+            except AttributeError:
+                pass
+    elif isinstance(context, discord.Guild):
+        guild = context
+    elif isinstance(context, commands.Context):
+        if hasattr(context, "guild"):
+            try:
+                guild = context.guild
+            except AttributeError:
+                pass
+        elif hasattr(context, "message"):
+            try:
+                if hasattr(context.message, "guild"):
+                    guild = context.message.guild
+            except AttributeError:
+                pass
+    elif hasattr(context, "guild"):
+        guild = context.guild
+    elif hasattr(context, "message"):
+        msg = context.message
+        if hasattr(msg, "guild"):
+            guild = msg.guild
+
+    if guild is not None and hasattr(guild, "id"):
+        srv_pre = prefixes_data.get(str(guild.id))
+        if srv_pre:
+            pre_data.remove(default)
+            pre_data.append(srv_pre)
+    if "ntd." not in pre_data:
+        pre_data.append("ntd.")
+    pre_data.extend([bot.user.mention + " ", "<@!%s> " % bot.user.id])
+
+    return pre_data
+
+
+class FakeUser:
+    id = 864019283490242570
+    mention = "<@864019283490242570>"
+
+
+class FakeBot:
+    user = FakeUser()
+
+
+class FakeGuild:
+    def __init__(self, id: int):
+        self.id = id
+
+
+class FakeMessage:
+    def __init__(self, guild: T.Optional[FakeGuild]):
+        self.guild = guild
+
+
+def bench(name: str, resolver: T.Callable[[FakeMessage], T.Any], messages: T.List[FakeMessage]):
+    start = time.perf_counter()
+    for idx in range(ITERATIONS):
+        resolver(messages[idx % len(messages)])
+    elapsed = time.perf_counter() - start
+    print(f"{name:>20} | {elapsed / ITERATIONS * 1e9:>10,.0f} ns/msg")
+
+
+def main():
+    bot = FakeBot()
+    prefixes_data = {str(guild_id): f"g{guild_id}." for guild_id in range(0, GUILDS, 2)}
+    table = PrefixTable("p/", prefixes_data)
+    table.bind_user(bot.user)
+    # Half of the guilds have a custom prefix, plus some DMs
+    messages = [FakeMessage(FakeGuild(guild_id)) for guild_id in range(GUILDS)] + [FakeMessage(None)] * 50
+
+    for message in messages:
+        old = prefixes_with_data(bot, message, prefixes_data=prefixes_data, default="p/")
+        assert tuple(old) == table(bot, message), message.guild
+
+    print(f"{'resolver':>20} | {'per message':>13}")
+    bench("prefixes_with_data", lambda m: prefixes_with_data(bot, m, prefixes_data, "p/"), messages)
+    bench("PrefixTable", lambda m: table(bot, m), messages)
+
+
+if __name__ == "__main__":
+    main()
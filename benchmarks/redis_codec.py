@@ -0,0 +1,125 @@
+"""
+Benchmark of the RedisBridge value codec.
+
+Compare the old text format (`b2dntcode_` prefix, `isnumeric()` and
+`orjson.loads` on every read) with the type-tagged codec on payloads
+that look like the data we actually store.
+
+Run it from the repository root:
+    python -m benchmarks.redis_codec
+"""
+
+import time
+from typing import Any
+
+import orjson
+from bson import ObjectId
+
+from phelper.codec import decode, encode, legacy_decode
+
+ITERATIONS = 2_000
+
+
+def legacy_encode(data: Any) -> bytes:
+    """The old `RedisBridge.stringify`, kept here for comparison."""
+
+    def _clean(objects: dict) -> dict:
+        return {k: v for k, v in objects.items() if not isinstance(v, ObjectId)}
+
+    if isinstance(data, bytes):
+        data = "b2dntcode_" + data.decode("utf-8")
+    elif isinstance(data, int):
+        data = str(data)
+    elif isinstance(data, (list, tuple, dict)):
+        if isinstance(data, dict):
+            data = _clean(data)
+        elif isinstance(data, list):
+            data = [_clean(d) if isinstance(d, dict) else d for d in data]
+        data = orjson.dumps(data, default=str).decode("utf-8")
+    return data.encode("utf-8")
+
+
+def modmail_ticket(messages: int = 500) -> dict:
+    user = {
+        "id": 466469077444067372,
+        "username": "potia",
+        "discriminator": "0001",
+        "avatar": "https://cdn.discordapp.com/avatars/466469077444067372/a_0123456789abcdef.png",
+    }
+    return {
+        "user": user,
+        "messages": [
+            {
+                "author": user,
+                "content": f"Halo admin, ini pesan ke-{i} tentang masalah akun saya di peladen." * 2,
+                "attachments": [
+                    {
+                        "url": f"https://cdn.discordapp.com/attachments/1/{i}/image.png",
+                        "filename": "image.png",
+                        "type": "image/png",
+                    }
+                ]
+                if i % 5 == 0
+                else [],
+                "timestamp": 1629481800.0 + i,
+            }
+            for i in range(messages)
+        ],
+        "channel": {"id": 864019283490242570, "name": "modmail-potia"},
+        "timestamp": 1629481800.0,
+        "is_hold": False,
+    }
+
+
+def live_list(streams: int = 20) -> list:
+    return [
+        {
+            "id": f"GRObk6TB{i:03d}",
+            "title": f"I, Tsushima - Episode {i:02d} [Takarir Indonesia]",
+            "status": "live",
+            "startTime": 1629481800 + i,
+            "thumbnail": f"https://i.ytimg.com/vi/GRObk6TB{i:03d}/maxresdefault.jpg",
+            "platform": "youtube",
+            "channel": "UCxxnxya_32jcKj4yN1_kD7A",
+            "msg_id": 864062464509476874 + i,
+        }
+        for i in range(streams)
+    ]
+
+
+PAYLOADS = {
+    "modmail (500 msgs)": modmail_ticket(),
+    "live list (20)": live_list(),
+    "feeds list (2000)": [f"GdPh2BF{i:04d}" for i in range(2000)],
+    "thread id (int)": 864019283490242570,
+}
+
+
+def timeit(func, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func(*args)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    header = f"{'payload':>20} | {'old write':>10} | {'new write':>10} | {'old read':>10} | {'new read':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, payload in PAYLOADS.items():
+        old_raw = legacy_encode(payload)
+        new_raw = encode(payload)
+        assert legacy_decode(old_raw) == payload
+        assert decode(new_raw) == payload
+        assert decode(old_raw) == payload
+        results = [
+            timeit(legacy_encode, payload),
+            timeit(encode, payload),
+            timeit(legacy_decode, old_raw),
+            timeit(decode, new_raw),
+        ]
+        print(f"{name:>20} | " + " | ".join(f"{r * 1e6:>7.1f} us" for r in results))
+
+
+if __name__ == "__main__":
+    main()
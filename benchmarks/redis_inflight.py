@@ -0,0 +1,70 @@
+"""
+Microbenchmark of the RedisBridge in-flight bookkeeping.
+
+Compare the old UUID lock list (append + `list.remove`) with the
+in-flight counter and drain event used by `RedisBridge.lock()/unlock()`.
+
+Run it from the repository root:
+    python -m benchmarks.redis_inflight
+"""
+
+import asyncio
+import time
+import uuid
+
+from phelper.redis import RedisBridge
+
+ITERATIONS = 100_000
+CONCURRENCY = (1, 100, 1000)
+
+
+class UUIDLockList:
+    """The old bookkeeping, kept here for comparison."""
+
+    def __init__(self):
+        self._need_execution = []
+
+    def lock(self, key: str):
+        self._need_execution.append(key)
+
+    def unlock(self, key: str):
+        try:
+            self._need_execution.remove(key)
+        except ValueError:
+            pass
+
+
+def bench_uuid_list(concurrency: int) -> float:
+    tracker = UUIDLockList()
+    # Simulate other operations that are still running
+    for _ in range(concurrency - 1):
+        tracker.lock("get_" + str(uuid.uuid4()))
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        uniq_id = str(uuid.uuid4())
+        tracker.lock("get_" + uniq_id)
+        tracker.unlock("get_" + uniq_id)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def bench_counter(concurrency: int) -> float:
+    bridge = RedisBridge("127.0.0.1", 6379, loop=asyncio.get_event_loop())
+    for _ in range(concurrency - 1):
+        bridge.lock()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        bridge.lock()
+        bridge.unlock()
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    print(f"{'concurrency':>12} | {'uuid list':>12} | {'counter':>12} | {'speedup':>8}")
+    for concurrency in CONCURRENCY:
+        old = bench_uuid_list(concurrency)
+        new = bench_counter(concurrency)
+        print(f"{concurrency:>12} | {old * 1e9:>9.0f} ns | {new * 1e9:>9.0f} ns | {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import logging
+from typing import List
 
 import discord
 from discord.enums import ChannelType
 from discord.ext import commands
 from phelper.bot import PotiaBot
+from phelper.events import EventSubscription
 
 
 class FeedsThreadManager(commands.Cog):
@@ -16,15 +18,22 @@ class FeedsThreadManager(commands.Cog):
         )
 
         self._EVENTS = {
-            "new live": self._on_new_live_creation,
-            "remove live": self._on_old_live_archival,
+            "live.new": self._on_new_live_creation,
+            "live.remove": self._on_old_live_archival,
         }
+        self._subscriptions: List[EventSubscription] = []
         for event, callback in self._EVENTS.items():
-            self.bot.pevents.on(event, callback)
+            # Creation and archival of the same live must not run at the same time.
+            # The live watcher dispatch it with `dispatch()`, so keep the queue unbounded to never drop it,
+            # there's only a handful of live per run anyway.
+            self.bot.pevents.configure(event, concurrency=2, queue_size=0, key=lambda data: data["id"])
+            self._subscriptions.append(self.bot.pevents.on(event, callback))
 
     def cog_unload(self):
-        for event in self._EVENTS.keys():
-            self.bot.pevents.off(event)
+        # Only unbind our own callbacks, other cogs might listen to the same event
+        for subscription in self._subscriptions:
+            subscription.off()
+        self._subscriptions.clear()
 
     @staticmethod
     def _remove_takarir(title: str):
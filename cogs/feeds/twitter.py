@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Set
 
 import discord
 from discord.ext import commands, tasks
@@ -25,9 +25,10 @@ class FeedsTwitterPosts(commands.Cog):
             "expansions": "author_id",
             "tweet.fields": "created_at",
         }
-        async with self.bot.aiosession.get(self.ENDPOINT, params=params, headers=headers) as resp:
-            data = await resp.json()
-            return data.get("data")
+        result = await self.bot.poller.poll_json(self.ENDPOINT, params=params, headers=headers)
+        if not result.changed:
+            return None
+        return result.data.get("data")
 
     @tasks.loop(minutes=3.0)
     async def _twitter_posts(self):
@@ -35,7 +36,10 @@ class FeedsTwitterPosts(commands.Cog):
         try:
             self.logger.info("Starting _twitter_posts process...")
             collected_posts = await self._fetch_twitter_posts()
-            old_posts_data: List[str] = await self.bot.redis.get("potiamuse_twposts", [])
+            if collected_posts is None:
+                self.logger.info("Twitter posts is unchanged, ignoring...")
+                return
+            old_posts_data: Set[str] = set(map(str, await self.bot.redis.smembers("potiamuse_twposts")))
             not_sended_yet = []
             for post in collected_posts:
                 if post["id"] not in old_posts_data:
@@ -49,10 +53,11 @@ class FeedsTwitterPosts(commands.Cog):
                     messages: discord.Message = await self._news_channels.send(
                         content=message_fmt.format(id=post)
                     )
-                    old_posts_data.append(post)
-                    await self.bot.redis.set("potiamuse_twposts", old_posts_data)
+                    await self.bot.redis.sadd("potiamuse_twposts", post)
                 except (discord.Forbidden, discord.HTTPException):
                     self.logger.warning(f"Failed to send this post: {post}")
+                    # Retry it on the next run even if the posts is unchanged
+                    self.bot.poller.forget(self.ENDPOINT)
                     continue
                 try:
                     await messages.publish()
@@ -61,11 +66,13 @@ class FeedsTwitterPosts(commands.Cog):
                     continue
         except Exception as e:
             self.logger.error("Failed to run `_twitter_posts`, traceback and stuff:")
+            self.bot.poller.forget(self.ENDPOINT)
             self.bot.echo_error(e)
 
     @_twitter_posts.before_loop
     async def before_twitter_posts(self):
         await self.bot.wait_until_ready()
+        await self.bot.redis.migrate_list_to_set("potiamuse_twposts")
 
 
 def setup(bot: PotiaBot):
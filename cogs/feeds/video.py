@@ -1,15 +1,20 @@
 import asyncio
 import logging
 import re
+import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
 import discord
 from discord.errors import HTTPException
 from discord.ext import commands, tasks
 from phelper.bot import PotiaBot
+from phelper.diff import diff_snapshots, key_by
+from phelper.snapshot import FixtureSnapshotSource, HTTPSnapshotSource, SnapshotFeed
+from phelper.utils import bounded_gather
 
-_MOCKED_SAMPLE = {
+# In-memory data for the `toggleytmock` command and for testing
+_MUSE_FIXTURE = {
     "live": [
         {
             "id": "GRObk6TBtBw",
@@ -37,6 +42,8 @@ _MOCKED_SAMPLE = {
 
 
 class LiveData:
+    __slots__ = ("id", "title", "status", "start_time", "thumbnail", "platform", "channel", "message_id")
+
     def __init__(
         self,
         id: str,
@@ -64,6 +71,18 @@ class LiveData:
             return self.id == other.id
         return False
 
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def same_content(self, other: "LiveData") -> bool:
+        """Check if the stream info is the same, ignoring the posted message"""
+        return (
+            self.title == other.title
+            and self.status == other.status
+            and self.start_time == other.start_time
+            and self.thumbnail == other.thumbnail
+        )
+
     def __repr__(self) -> str:
         return f'<LiveData id="{self.id}" {self.start_time}>'
 
@@ -114,7 +133,22 @@ class FeedsYoutubeVideo(commands.Cog):
         )
 
         self._last_data = 0
+        # The migration is shared by every loop, only run it once
+        self._migrate_lock = asyncio.Lock()
+        self._is_migrated = False
+        # The live state that failed to be saved to Redis: (video ID -> live data, removed video IDs)
+        self._unsaved_live: Optional[Tuple[Dict[str, dict], List[str]]] = None
         self._mock_it = False
+        # The live watcher run every minute, the first thread event of a live is dispatched right away
+        # and a flapping live across the next two polls is collapsed, so the thread is only
+        # created/archived once.
+        self._LIVE_EVENT_WINDOW = 150.0
+        # How many Discord request the live watcher run at the same time
+        self._DISCORD_CONCURRENCY = 4
+
+        # Every watcher share the same data, so fetch it once at the fastest watcher interval.
+        self._muse_feed = SnapshotFeed("museid", self._muse_source(), 60.0, self.bot.loop)
+        self._muse_feed.start()
 
         self._upcoming_watcher.start()
         self._live_watcher.start()
@@ -123,22 +157,28 @@ class FeedsYoutubeVideo(commands.Cog):
     def cog_unload(self):
         self._upcoming_watcher.cancel()
         self._live_watcher.cancel()
-        self._archive_feeds_watcher.start()
+        self._archive_feeds_watcher.cancel()
+        self.bot.loop.create_task(self._muse_feed.stop())
 
-    async def request_muse(self):
+    def _muse_source(self):
         if self._mock_it:
-            return _MOCKED_SAMPLE["live"], _MOCKED_SAMPLE["upcoming"], _MOCKED_SAMPLE["feeds"]
-        async with self.bot.aiosession.get("https://api.ihateani.me/museid/live") as resp:
-            if "json" not in resp.content_type:
-                raise ValueError()
-            if resp.status != 200:
-                raise ValueError()
-            res = await resp.json()
-            return res["live"], res["upcoming"], res["feeds"]
+            return FixtureSnapshotSource(_MUSE_FIXTURE)
+        return HTTPSnapshotSource(self.bot.poller, "https://api.ihateani.me/museid/live", "museid")
+
+    def request_muse(self, subscriber: str):
+        """Get the newest Muse Indonesia data, return `None` if `subscriber` already received it"""
+        snapshot = self._muse_feed.latest(subscriber)
+        if snapshot is None:
+            return None
+        res = snapshot.data
+        return res["live"], res["upcoming"], res["feeds"]
 
     async def request_feeds_data(self, limit=25):
         self.logger.info("Requesting feeds data...")
-        _, _, feeds_data = await self.request_muse()
+        muse_data = self.request_muse("feeds")
+        if muse_data is None:
+            return None
+        _, _, feeds_data = muse_data
         if limit is not None:
             if isinstance(limit, str):
                 try:
@@ -151,14 +191,10 @@ class FeedsYoutubeVideo(commands.Cog):
 
     async def update_upcoming(self):
         self.logger.info("Collecting upcoming data...")
-        try:
-            _, upcoming_yt, _ = await asyncio.wait_for(self.request_muse(), 20.0)
-        except ValueError:
-            self.logger.error("Received youtube data are not JSON, cancelling...")
-            return ["Gagal mengambil data..."]
-        except asyncio.TimeoutError:
-            self.logger.error("Timeout error")
-            return ["Gagal mengambil data..."]
+        muse_data = self.request_muse("upcoming")
+        if muse_data is None:
+            return None
+        _, upcoming_yt, _ = muse_data
 
         collected_yt: List[dict] = []
         for yt in upcoming_yt:
@@ -203,6 +239,7 @@ class FeedsYoutubeVideo(commands.Cog):
     @commands.is_owner()
     async def _toggle_yt_mock(self, ctx: commands.Context):
         self._mock_it = not self._mock_it
+        self._muse_feed.set_source(self._muse_source())
         await ctx.send("Diubah!")
 
     @tasks.loop(minutes=5.0)
@@ -213,6 +250,9 @@ class FeedsYoutubeVideo(commands.Cog):
         try:
             self.logger.info("Running...")
             upcoming_res = await self.update_upcoming()
+            if upcoming_res is None:
+                self.logger.info("Upcoming data is unchanged, sleeping for 5 minutes")
+                return
             embed = discord.Embed(timestamp=datetime.now(tz=self.wib))
             if upcoming_res:
                 embed.add_field(name="Akan datang!", value=self._truncate_fields(upcoming_res), inline=False)
@@ -227,17 +267,102 @@ class FeedsYoutubeVideo(commands.Cog):
                     await partial_msg.edit(embed=embed)
                 except discord.HTTPException:
                     self.logger.error("Failed to update the upcoming embed!")
+                    self._muse_feed.forget("upcoming")
             self.logger.info("This run is now finished, sleeping for 5 minutes")
         except Exception as e:
+            self._muse_feed.forget("upcoming")
             self.bot.echo_error(e)
 
     async def _get_old_live_data(self):
-        old_posted_raw = await self.bot.redis.get("potiamuse_live")
+        # Video ID -> the posted live data
+        old_posted_raw = await self.bot.redis.hgetall("potiamuse_live")
         new_data: List[LiveData] = []
-        for post in old_posted_raw:
+        for post in old_posted_raw.values():
             new_data.append(LiveData.from_dict(post))
         return new_data
 
+    async def _reconcile_live_messages(self):
+        """Remove the "Sedang Tayang!" message that is not tracked anymore, in one pass"""
+        channels: discord.TextChannel = self.bot.get_channel(864018911884607508)
+        if channels is None:
+            return
+        tracked_ids = {live.message_id for live in await self._get_old_live_data()}
+        orphaned: List[discord.Message] = []
+        self.logger.info("Reconciling posted live messages...")
+        try:
+            async for message in channels.history(limit=200):
+                if message.author.id != self.bot.user.id or message.content != "Sedang Tayang!":
+                    continue
+                if message.id not in tracked_ids:
+                    orphaned.append(message)
+        except discord.HTTPException:
+            self.logger.warning("Failed to read the channel history, skipping reconciliation...")
+            return
+        if not orphaned:
+            return
+        self.logger.info(f"Removing {len(orphaned)} orphaned live messages...")
+        for message in orphaned:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                self.logger.warning(f"Failed to remove orphaned message {message.id}, ignoring...")
+
+    def _generate_live_embed(self, live: LiveData) -> discord.Embed:
+        stream_url = f"https://youtube.com/watch?v={live.id}"
+        embed = discord.Embed(
+            title=live.title,
+            colour=0xFF0000,
+            url=stream_url,
+            description=f"[Tonton Sekarang!]({stream_url})",
+        )
+        embed.set_image(url=f"https://i.ytimg.com/vi/{live.id}/maxresdefault.jpg")
+        embed.set_thumbnail(url="https://s.ytimg.com/yts/img/favicon_144-vfliLAfaB.png")
+        embed.set_author(
+            name=self._museid_info["name"],
+            icon_url=self._museid_info["icon"],
+            url=self._museid_info["url"],
+        )
+        embed.set_footer(text=live.id, icon_url="https://s.ytimg.com/yts/img/favicon_144-vfliLAfaB.png")
+        return embed
+
+    async def _save_live_state(self, updated: Dict[str, dict], removed: List[str]) -> bool:
+        """Save the live state changes, the failed one is kept and merged to the next save"""
+        if self._unsaved_live is not None:
+            unsaved_updated, unsaved_removed = self._unsaved_live
+            merged_updated = {vid: data for vid, data in unsaved_updated.items() if vid not in removed}
+            merged_updated.update(updated)
+            removed = [vid for vid in unsaved_removed if vid not in updated] + removed
+            updated = merged_updated
+        if await self.bot.redis.hupdate("potiamuse_live", updated, removed):
+            self._unsaved_live = None
+            return True
+        self._unsaved_live = (updated, removed)
+        return False
+
+    async def _delete_live(self, channels: discord.TextChannel, live: LiveData) -> bool:
+        try:
+            await channels.get_partial_message(live.message_id).delete()
+        except discord.NotFound:
+            # Already deleted by someone else
+            return True
+        except HTTPException:
+            return False
+        return True
+
+    async def _post_live(self, channels: discord.TextChannel, live: LiveData) -> Optional[int]:
+        try:
+            msg_info = await channels.send(content="Sedang Tayang!", embed=self._generate_live_embed(live))
+        except HTTPException:
+            return None
+        return msg_info.id
+
+    async def _edit_live(self, channels: discord.TextChannel, live: LiveData) -> bool:
+        try:
+            await channels.get_partial_message(live.message_id).edit(embed=self._generate_live_embed(live))
+        except HTTPException:
+            return False
+        return True
+
     def _parse_new_live(self, data: List[dict]):
         new_live_data: List[LiveData] = []
         for d in data:
@@ -249,106 +374,137 @@ class FeedsYoutubeVideo(commands.Cog):
         channels: discord.TextChannel = self.bot.get_channel(864018911884607508)
         try:
             self.logger.info("Running...")
-            current_lives_yt, _, _ = await self.request_muse()
+            marks = [("start", time.perf_counter())]
+            if self._unsaved_live is not None:
+                # The posted messages must be saved first, or it will be posted/deleted again
+                self.logger.info("Retrying to save the previous live data...")
+                if not await self._save_live_state({}, []):
+                    self.logger.error("Failed to save the previous live data, skipping this run...")
+                    return
+            muse_data = self.request_muse("live")
+            if muse_data is None:
+                self.logger.info("Live data is unchanged, sleeping for 1 minute")
+                return
+            current_lives_yt, _, _ = muse_data
             self.logger.info("Collecting all posted live message")
             current_lives_yt = self._parse_new_live(current_lives_yt)
             posted_yt_lives = await self._get_old_live_data()
-            # old_posted_yt_lives: list = await self.bot.redis.get("potiamuse_live")
             self.logger.debug(f"Old live post: {posted_yt_lives}")
 
-            self.logger.info("Propagating the IDs...")
-            collected_posted_ids = [c.id for c in posted_yt_lives]
-            self.logger.debug(f"Propagated posted IDs: {collected_posted_ids}")
-            collected_lives_ids = [c.id for c in current_lives_yt]
-            self.logger.debug(f"Propagated lives IDs: {collected_lives_ids}")
-
-            self.logger.info("Collecting everything...")
-            need_to_be_deleted: List[LiveData] = []
-            need_to_be_posted: List[LiveData] = []
-            check_delete_later: List[str] = []
-            for live_info in current_lives_yt:
-                if live_info.id not in collected_posted_ids:
-                    need_to_be_posted.append(live_info)
-            for p_live_info in posted_yt_lives:
-                if p_live_info.id not in collected_lives_ids:
-                    need_to_be_deleted.append(p_live_info)
-                    check_delete_later.append(p_live_info.id)
+            self.logger.info("Comparing with the posted lives...")
+            live_diff = diff_snapshots(
+                key_by(posted_yt_lives, lambda x: x.id),
+                key_by(current_lives_yt, lambda x: x.id),
+                LiveData.same_content,
+            )
             self.logger.debug(
-                f"Propagated collection, posts: {need_to_be_deleted}, remove: {need_to_be_posted}"
+                f"Live diff, posts: {live_diff.added}, remove: {live_diff.removed}, "
+                f"changed: {live_diff.changed}"
             )
+            marks.append(("diff", time.perf_counter()))
+
             self.logger.info("Deleting old data first...")
-            for deletion in need_to_be_deleted:
-                self.logger.info(f"Trying to delete: {deletion}")
-                if self._mock_it:
-                    continue
-                if "takarir indonesia" in deletion.title.lower():
-                    self.bot.pevents.dispatch("remove live", deletion.serialize())
-                try:
-                    delete_this: discord.Message = await channels.fetch_message(deletion.message_id)
-                    await delete_this.delete()
-                except HTTPException:
-                    self.logger.warning(f"Failed to remove video ID {deletion.id}, ignoring...")
+            deletions = [live for live in live_diff.removed if live.message_id is not None]
+            if not self._mock_it:
+                for deletion in live_diff.removed:
+                    if "takarir indonesia" in deletion.title.lower():
+                        self.bot.pevents.dispatch(
+                            "live.remove",
+                            deletion.serialize(),
+                            coalesce_key=f"live:{deletion.id}",
+                            window=self._LIVE_EVENT_WINDOW,
+                        )
+                deleted = await bounded_gather(
+                    *[self._delete_live(channels, deletion) for deletion in deletions],
+                    limit=self._DISCORD_CONCURRENCY,
+                )
+                for deletion, is_deleted in zip(deletions, deleted):
+                    if not is_deleted:
+                        self.logger.warning(f"Failed to remove video ID {deletion.id}, ignoring...")
+            marks.append(("delete", time.perf_counter()))
 
             collected_again: List[LiveData] = []
             self.logger.info("Now adding new data if exist...")
-            for post_this in need_to_be_posted:
-                self.logger.info(f"Posting: {post_this.id}")
-                if self._mock_it:
-                    collected_again.append(post_this)
-                    continue
-
-                stream_url = f"https://youtube.com/watch?v={post_this.id}"
-                embed = discord.Embed(
-                    title=post_this.title,
-                    colour=0xFF0000,
-                    url=stream_url,
-                    description=f"[Tonton Sekarang!]({stream_url})",
-                )
-                embed.set_image(url=f"https://i.ytimg.com/vi/{post_this.id}/maxresdefault.jpg")  # noqa: E501
-                embed.set_thumbnail(url="https://s.ytimg.com/yts/img/favicon_144-vfliLAfaB.png")
-                embed.set_author(
-                    name=self._museid_info["name"],
-                    icon_url=self._museid_info["icon"],
-                    url=self._museid_info["url"],
-                )
-                embed.set_footer(
-                    text=post_this.id, icon_url="https://s.ytimg.com/yts/img/favicon_144-vfliLAfaB.png"
+            if self._mock_it:
+                collected_again.extend(live_diff.added)
+            else:
+                posted_ids = await bounded_gather(
+                    *[self._post_live(channels, post_this) for post_this in live_diff.added],
+                    limit=self._DISCORD_CONCURRENCY,
                 )
-                try:
-                    msg_info: discord.Message = await channels.send(content="Sedang Tayang!", embed=embed)
-                    post_this.message_id = msg_info.id
+                # Apply it in the diff order, not in the order the request finished
+                for post_this, message_id in zip(live_diff.added, posted_ids):
+                    if message_id is None:
+                        self.logger.warning(f"Failed to post video ID {post_this.id}, ignoring...")
+                        # Retry it on the next run even if the data is unchanged
+                        self._muse_feed.forget("live")
+                        continue
+                    post_this.message_id = message_id
                     if "takarir indonesia" in post_this.title.lower():
-                        self.bot.pevents.dispatch("new live", post_this.serialize())
+                        self.bot.pevents.dispatch(
+                            "live.new",
+                            post_this.serialize(),
+                            coalesce_key=f"live:{post_this.id}",
+                            window=self._LIVE_EVENT_WINDOW,
+                        )
                     collected_again.append(post_this)
-                except discord.HTTPException:
-                    self.logger.warning(f"Failed to post video ID {post_this.id}, ignoring...")
+            marks.append(("post", time.perf_counter()))
+
+            self.logger.info("Updating changed live data...")
+            need_edit: List[LiveData] = []
+            for old_live, new_live in live_diff.changed:
+                new_live.message_id = old_live.message_id
+                collected_again.append(new_live)
+                if old_live.title != new_live.title and new_live.message_id is not None:
+                    need_edit.append(new_live)
+            if need_edit and not self._mock_it:
+                edited = await bounded_gather(
+                    *[self._edit_live(channels, new_live) for new_live in need_edit],
+                    limit=self._DISCORD_CONCURRENCY,
+                )
+                for new_live, is_edited in zip(need_edit, edited):
+                    if not is_edited:
+                        self.logger.warning(f"Failed to update video ID {new_live.id}, ignoring...")
+            marks.append(("update", time.perf_counter()))
 
             self.logger.info("Merging with old video data...")
-            collected_again.extend(posted_yt_lives)
-            real_and_true = []
-            for c in collected_again:
-                if c.id not in check_delete_later:
-                    real_and_true.append(c.serialize())
+            live_count = len(collected_again) + len(live_diff.unchanged)
             self.logger.info("Checking live status...")
             is_changed = False
-            if not channels.name.startswith("🔴") and len(real_and_true) > 0:
+            if not channels.name.startswith("🔴") and live_count > 0:
                 channel_name = "🔴-rilisan-tayang"
                 is_changed = True
-            elif channels.name.startswith("🔴") and len(real_and_true) < 1:
+            elif channels.name.startswith("🔴") and live_count < 1:
                 channel_name = "rilisan-tayang"
                 is_changed = True
-            self._last_data = len(real_and_true)
+            self._last_data = live_count
 
-            self.logger.info("Saving data...")
-            await self.bot.redis.set("potiamuse_live", real_and_true)
+            if live_diff.is_empty:
+                self.logger.info("Nothing changed, not saving the data...")
+            else:
+                # Only the changed videos is written, in a single transaction
+                self.logger.info("Saving data...")
+                is_saved = await self._save_live_state(
+                    {live.id: live.serialize() for live in collected_again},
+                    [deletion.id for deletion in live_diff.removed],
+                )
+                if not is_saved:
+                    self.logger.error("Failed to save the live data, retrying on the next run...")
+                    self._muse_feed.forget("live")
             if is_changed and not self._mock_it:
                 self.logger.info("Changing the channel name...")
                 try:
                     await channels.edit(name=channel_name)
                 except discord.HTTPException:
                     self.logger.warning("Failed to rename the channel name, ignoring...")
-            self.logger.info("This run is now finished, sleeping for 1 minute")
+                    self._muse_feed.forget("live")
+            marks.append(("save", time.perf_counter()))
+            took = ", ".join(
+                f"{phase} {(end - begin) * 1000:.0f}ms" for (_, begin), (phase, end) in zip(marks, marks[1:])
+            )
+            self.logger.info(f"This run is now finished ({took}), sleeping for 1 minute")
         except Exception as e:
+            self._muse_feed.forget("live")
             self.bot.echo_error(e)
 
     @tasks.loop(minutes=2.0)
@@ -359,28 +515,27 @@ class FeedsYoutubeVideo(commands.Cog):
         try:
             self.logger.info("Running...")
             new_feeds = await self.request_feeds_data()
+            if new_feeds is None:
+                self.logger.info("Feeds data is unchanged, sleeping for 2 minutes")
+                return
             if len(new_feeds) < 1:
                 self.logger.warning("Got empty response from API, ignoring...")
                 return
-            saved_feeds = await self.bot.redis.get("potiamuse_feeds")
             first_run = False
-            if saved_feeds is None:
+            if not await self._is_feeds_seeded():
                 self.logger.info("First run detected, will not send anything and save everything!")
                 first_run = True
-                saved_feeds = []
+            saved_feeds = set(map(str, await self.bot.redis.smembers("potiamuse_feeds")))
 
             self.logger.info("Merging and filtering...")
-            need_to_be_posted = list(filter(lambda x: x not in saved_feeds, new_feeds))
+            need_to_be_posted = [feed for feed in new_feeds if feed not in saved_feeds]
 
-            concatted_feeds = []
-            concatted_feeds.extend(saved_feeds)
-            concatted_feeds.extend(need_to_be_posted)
+            self.logger.info("Saving and will start sending feed")
+            await self.bot.redis.sadd("potiamuse_feeds", *need_to_be_posted)
 
             if first_run:
+                await self.bot.redis.set("potiamuse_feeds_seeded", True)
                 need_to_be_posted = []
-
-            self.logger.info("Saving and will start sending feed")
-            await self.bot.redis.set("potiamuse_feeds", concatted_feeds)
             for post_this in need_to_be_posted:
                 self.logger.info(f"Posting: {post_this}")
                 text_fmt = f"Rilisan baru di Muse Indonesia! https://youtube.com/watch?v={post_this}"
@@ -396,15 +551,42 @@ class FeedsYoutubeVideo(commands.Cog):
                     self.logger.warning(f"Failed to send video ID {post_this}, ignoring...")
             self.logger.info("This run is now finished, sleeping for 2 minutes")
         except Exception as e:
+            self._muse_feed.forget("feeds")
             self.bot.echo_error(e)
 
+    async def _is_feeds_seeded(self) -> bool:
+        # An empty set does not exist on Redis, so use a marker key to detect the first run
+        if await self.bot.redis.exists("potiamuse_feeds_seeded"):
+            return True
+        if await self.bot.redis.exists("potiamuse_feeds"):
+            await self.bot.redis.set("potiamuse_feeds_seeded", True)
+            return True
+        return False
+
+    async def _migrate_feeds_state(self):
+        async with self._migrate_lock:
+            if self._is_migrated:
+                return
+            if await self.bot.redis.migrate_list_to_set("potiamuse_feeds"):
+                # The old list might be empty, which remove the key
+                await self.bot.redis.set("potiamuse_feeds_seeded", True)
+            self._is_migrated = True
+
     @_upcoming_watcher.before_loop
-    @_live_watcher.before_loop
     @_archive_feeds_watcher.before_loop
     async def _before_all_tasks(self):
         await self.bot.wait_until_ready()
+        await self._migrate_feeds_state()
+        if not await self._muse_feed.wait_ready():
+            self.logger.warning("Muse Indonesia data is not available yet, will try again later")
         self.logger.info("All tasks are now ready")
 
+    @_live_watcher.before_loop
+    async def _before_live_watcher(self):
+        await self._before_all_tasks()
+        await self.bot.redis.migrate_list_to_hash("potiamuse_live", "id")
+        await self._reconcile_live_messages()
+
 
 def setup(bot: PotiaBot):
     bot.add_cog(FeedsYoutubeVideo(bot))
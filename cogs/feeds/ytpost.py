@@ -1,9 +1,10 @@
 import logging
-from typing import List
+from typing import Set
 
 import discord
 from discord.ext import commands, tasks
 from phelper.bot import PotiaBot
+from phelper.poller import PollError
 
 
 def trim_text(text: str, max_len: int) -> str:
@@ -15,6 +16,8 @@ def trim_text(text: str, max_len: int) -> str:
 
 
 class FeedsYoutubePosts(commands.Cog):
+    ENDPOINT = "https://naotimes-og.glitch.me/ytposts/UCxxnxya_32jcKj4yN1_kD7A"
+
     def __init__(self, bot: PotiaBot) -> None:
         self.bot = bot
 
@@ -33,24 +36,19 @@ class FeedsYoutubePosts(commands.Cog):
         self._youtube_posts.cancel()
 
     async def collect_muse_yt_posts(self):
+        """Fetch the community posts, return `None` if it's unchanged since the last fetch"""
         self.logger.info("Fetching community pages...")
-        async with self.bot.aiosession.get(
-            "https://naotimes-og.glitch.me/ytposts/UCxxnxya_32jcKj4yN1_kD7A"
-        ) as resp:
-            if resp.status != 200:
-                self.logger.error("Got non 200 status code, returning anyway")
-                return []
-            content_type: str = resp.headers["content-type"]
-            if not content_type.startswith("application/json"):
-                self.logger.error("Received response are not JSON ignoring...")
-                return []
-            try:
-                all_pages = await resp.json()
-            except Exception:
-                self.logger.error("Failed to parse JSON response")
-                return []
+        try:
+            result = await self.bot.poller.poll_json(self.ENDPOINT)
+        except PollError as e:
+            self.logger.error(f"Failed to fetch community pages, returning anyway: {e}")
+            return []
+        if not result.changed:
+            return None
+        all_pages = result.data
         if not all_pages["success"]:
             self.logger.error("The API failed to parse the posts result")
+            self.bot.poller.forget(self.ENDPOINT)
             return []
         return all_pages["posts"]
 
@@ -86,7 +84,10 @@ class FeedsYoutubePosts(commands.Cog):
         try:
             self.logger.info("Starting _youtube_posts process...")
             collected_posts = await self.collect_muse_yt_posts()
-            old_posts_data: List[str] = await self.bot.redis.get("potiamuse_ytposts", [])
+            if collected_posts is None:
+                self.logger.info("Community pages is unchanged, ignoring...")
+                return
+            old_posts_data: Set[str] = set(map(str, await self.bot.redis.smembers("potiamuse_ytposts")))
             not_sended_yet = []
             for post in collected_posts:
                 if post["id"] not in old_posts_data:
@@ -105,10 +106,11 @@ class FeedsYoutubePosts(commands.Cog):
                     messages: discord.Message = await self._news_channels.send(
                         content=message_fmt + post["id"] + ">", embed=embed_post
                     )
-                    old_posts_data.append(post["id"])
-                    await self.bot.redis.set("potiamuse_ytposts", old_posts_data)
+                    await self.bot.redis.sadd("potiamuse_ytposts", post["id"])
                 except (discord.Forbidden, discord.HTTPException):
                     self.logger.warning(f"Failed to send this post: {post['id']}")
+                    # Retry it on the next run even if the posts is unchanged
+                    self.bot.poller.forget(self.ENDPOINT)
                     continue
                 try:
                     await messages.publish()
@@ -117,11 +119,13 @@ class FeedsYoutubePosts(commands.Cog):
             self.logger.info("Saving posted data to redis...")
         except Exception as e:
             self.logger.error("Failed to run `_youtube_posts`, traceback and stuff:")
+            self.bot.poller.forget(self.ENDPOINT)
             self.bot.echo_error(e)
 
     @_youtube_posts.before_loop
     async def _before_loop(self):
         await self.bot.wait_until_ready()
+        await self.bot.redis.migrate_list_to_set("potiamuse_ytposts")
 
 
 def setup(bot: PotiaBot):
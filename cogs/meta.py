@@ -69,6 +69,128 @@ class BotMetaCommands(commands.Cog):
             text_res += f"\n{ws_res}"
             await channel.send(content=text_res)
 
+    @commands.command(name="eventstats")
+    @commands.is_owner()
+    async def meta_event_stats(self, ctx: commands.Context):
+        all_stats = self.bot.pevents.stats()
+        queue_stats = self.bot.pevents.queue_stats()
+        if not all_stats and not queue_stats:
+            return await ctx.send("Belum ada event yang dijalankan!")
+
+        lines = []
+        for event_name, callbacks in sorted(all_stats.items()):
+            lines.append(f"[{event_name}]")
+            for qualname, stats in sorted(callbacks.items(), key=lambda x: x[1]["p95"], reverse=True):
+                lines.append(f"  {qualname}")
+                lines.append(
+                    f"    calls={stats['calls']} errors={stats['errors']} cancelled={stats['cancelled']} "
+                    f"p50={stats['p50'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms "
+                    f"p99={stats['p99'] * 1000:.1f}ms"
+                )
+        for event_name, stats in sorted(queue_stats.items()):
+            lines.append(f"[pool:{event_name}]")
+            lines.append(
+                "  policy={policy} workers={concurrency} depth={depth}/{max_size} dispatched={dispatched} "
+                "dropped={dropped} processed={processed}".format(**stats)
+            )
+            lines.append(
+                "  wait avg={:.1f}ms max={:.1f}ms".format(stats["avg_wait"] * 1000, stats["max_wait"] * 1000)
+            )
+        text_res = "\n".join(lines)
+        if len(text_res) > 1900:
+            text_res = text_res[:1900] + "\n[...]"
+        await ctx.send(content=f"```ini\n{text_res}\n```")
+
+    @commands.command(name="startupstats")
+    @commands.is_owner()
+    async def meta_startup_stats(self, ctx: commands.Context):
+        text_res = self.bot.startup.format_table()
+        if len(text_res) > 1900:
+            text_res = text_res[:1900] + "\n[...]"
+        await ctx.send(content=f"```\n{text_res}\n```")
+
+    @commands.command(name="pollstats")
+    @commands.is_owner()
+    async def meta_poll_stats(self, ctx: commands.Context):
+        all_stats = self.bot.poller.stats()
+        if not all_stats:
+            return await ctx.send("Belum ada endpoint yang di-poll!")
+
+        lines = []
+        for key, stats in sorted(all_stats.items()):
+            lines.append(f"[{key}]")
+            lines.append(
+                "  requests={requests} hits={hits} misses={misses} errors={errors} "
+                "saved={saved:.1f}KiB".format(saved=stats["bytes_saved"] / 1024, **stats)
+            )
+        text_res = "\n".join(lines)
+        if len(text_res) > 1900:
+            text_res = text_res[:1900] + "\n[...]"
+        await ctx.send(content=f"```ini\n{text_res}\n```")
+
+    @commands.command(name="modlogstats")
+    @commands.is_owner()
+    async def meta_modlog_stats(self, ctx: commands.Context):
+        stats = self.bot.modlog_stats()
+        if not stats:
+            return await ctx.send("Modlog belum diaktifkan!")
+
+        lines = [
+            "[modlog]",
+            "  depth={depth} messages={messages} logs={logs} retries={retries} dropped={dropped}".format(
+                **stats
+            ),
+            "  flush p50={:.1f}ms p95={:.1f}ms".format(stats["flush_p50"] * 1000, stats["flush_p95"] * 1000),
+            "  queued p50={:.1f}ms p95={:.1f}ms".format(
+                stats["queued_p50"] * 1000, stats["queued_p95"] * 1000
+            ),
+        ]
+        text_res = "\n".join(lines)
+        await ctx.send(content=f"```ini\n{text_res}\n```")
+
+    @commands.command(name="redisstats")
+    @commands.is_owner()
+    async def meta_redis_stats(self, ctx: commands.Context):
+        if self.bot.redis is None:
+            return await ctx.send("Redis belum terhubung!")
+
+        lines = ["[cache]"]
+        cache_stats = self.bot.redis.cache_stats()
+        if cache_stats:
+            lines.append(
+                "  size={size}/{max_size} hits={hits} negative={negative_hits} misses={misses} "
+                "ratio={ratio:.1f}%".format(ratio=cache_stats["hit_ratio"] * 100, **cache_stats)
+            )
+            lines.append("  evictions={evictions} invalidations={invalidations}".format(**cache_stats))
+        else:
+            lines.append("  disabled")
+        lines.append("[write-behind]")
+        lines.append(
+            "  pending={pending} coalesced={coalesced}".format(**self.bot.redis.write_behind_stats())
+        )
+        compression_stats = self.bot.redis.compression_stats()
+        if compression_stats:
+            lines.append("[compression]")
+            lines.append(
+                "  compressed={compressed} skipped={skipped} raw={raw:.1f}KiB stored={stored:.1f}KiB "
+                "ratio={ratio:.1f}%".format(
+                    raw=compression_stats["raw_bytes"] / 1024,
+                    stored=compression_stats["compressed_bytes"] / 1024,
+                    ratio=compression_stats["ratio"] * 100,
+                    compressed=compression_stats["compressed"],
+                    skipped=compression_stats["skipped"],
+                )
+            )
+            lines.append(
+                "  compress={:.1f}ms decompressed={} decompress={:.1f}ms".format(
+                    compression_stats["compress_time"] * 1000,
+                    compression_stats["decompressed"],
+                    compression_stats["decompress_time"] * 1000,
+                )
+            )
+        text_res = "\n".join(lines)
+        await ctx.send(content=f"```ini\n{text_res}\n```")
+
 
 def setup(bot: PotiaBot):
     bot.add_cog(BotMetaCommands(bot))
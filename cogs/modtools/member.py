@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Set
 
 import discord
 from discord.errors import HTTPException
@@ -14,7 +14,7 @@ class ModToolsMember(commands.Cog):
     def __init__(self, bot: PotiaBot):
         self.bot = bot
         self.logger = logging.getLogger("ModTools.Member")
-        self._shadowbanned = []
+        self._shadowbanned: Set[str] = set()
         self._currently_muted = []
         self._guild_id = 864004899783180308
         self._guild: discord.Guild = None
@@ -36,7 +36,8 @@ class ModToolsMember(commands.Cog):
         self._guild = self.bot.get_guild(self._guild_id)
         self._mute_role = self._guild.get_role(866180421196447765)
         self.logger.info("Collecting shadowbanned user on Muse server...")
-        all_shadowbanned: list = await self.bot.redis.get(self._rdsb_id, [])
+        await self.bot.redis.migrate_list_to_set(self._rdsb_id)
+        all_shadowbanned = set(map(str, await self.bot.redis.smembers(self._rdsb_id)))
         self.logger.info(f"Found: {len(all_shadowbanned)} member is shadowbanned.")
         self._shadowbanned = all_shadowbanned
         self.logger.info("Collecting all currently muted member...")
@@ -162,13 +163,13 @@ class ModToolsMember(commands.Cog):
         user_id = str(user_id)
         if action == "BAN":
             if user_id not in self._shadowbanned:
-                self._shadowbanned.append(user_id)
-                await self.bot.redis.set(self._rdsb_id, self._shadowbanned)
+                self._shadowbanned.add(user_id)
+                await self.bot.redis.sadd(self._rdsb_id, user_id)
                 return True
         elif action == "UNBAN":
             if user_id in self._shadowbanned:
-                self._shadowbanned.remove(user_id)
-                await self.bot.redis.set(self._rdsb_id, self._shadowbanned)
+                self._shadowbanned.discard(user_id)
+                await self.bot.redis.srem(self._rdsb_id, user_id)
                 return True
         return False
 
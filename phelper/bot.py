@@ -1,23 +1,28 @@
-import functools
+import asyncio
+import hashlib
 import logging
 import os
 import sys
 import traceback
 from contextlib import suppress
 from datetime import datetime, timezone
-from typing import AnyStr, Optional, TypeVar, Union
+from typing import TYPE_CHECKING, AnyStr, Optional, TypeVar, Union
 
 import aiohttp
 import discord
-import wavelink
 from discord.ext import commands
 
 from .config import PotiaBotConfig
-from .events import EventManager
-from .modlog import PotiaModLog
-from .redis import RedisBridge
-from .utils import __version__, explode_filepath_into_pieces, prefixes_with_data
-from .welcomer import WelcomeGenerator
+from .events import EventManager, RedisEventTransport
+from .modlog import ModLogQueue, PotiaModLog
+from .poller import HTTPPoller
+from .redis import RedisBridge, RedisCompression, RedisLocalCache
+from .startup import StartupReport
+from .utils import PrefixTable, __version__, explode_filepath_into_pieces
+
+# wavelink is only used by the music cogs, dont pay the import cost on every startup
+if TYPE_CHECKING:
+    import wavelink
 
 T = TypeVar("T")
 UserContext = Union[discord.Member, discord.User, discord.TeamMember]
@@ -38,13 +43,17 @@ class PotiaBot(commands.Bot):
         self.config = bot_config
         self.prefix = bot_config.default_prefix
         self.fcwd = base_path
+        self.startup = StartupReport()
 
-        self.wavelink: wavelink.Client
+        self.wavelink: "wavelink.Client"
 
         self._modlog_channel: discord.TextChannel = None
+        self._modlog_queue: ModLogQueue = None
         self.redis: RedisBridge = None
         self.pevents: EventManager = None
         self.aiosession: aiohttp.ClientSession = None
+        self.poller: HTTPPoller = None
+        self.prefixes: PrefixTable = None
 
     def now(self) -> datetime:
         return datetime.now(tz=timezone.utc)
@@ -74,10 +83,29 @@ class PotiaBot(commands.Bot):
         Initialize the main bot process
         """
         self.logger.info("Initializing bot...")
+        self._modlog_queue = ModLogQueue(self.loop)
         self.logger.info("Connecting to RedisDB....")
 
         redis_conf = self.config.redis
-        redis_conn = RedisBridge(redis_conf.ip_hostname, redis_conf.port, redis_conf.password, self.loop)
+        redis_cache = None
+        if redis_conf.cache is not None and redis_conf.cache.enabled:
+            self.logger.info("Enabling local Redis cache...")
+            cache_conf = redis_conf.cache
+            redis_cache = RedisLocalCache(cache_conf.ttls, cache_conf.max_size, cache_conf.negative_ttl)
+        redis_compression = None
+        if redis_conf.compression is not None:
+            self.logger.info("Enabling Redis value compression...")
+            compress_conf = redis_conf.compression
+            redis_compression = RedisCompression(compress_conf.rules, compress_conf.level)
+        redis_conn = RedisBridge(
+            redis_conf.ip_hostname,
+            redis_conf.port,
+            redis_conf.password,
+            self.loop,
+            cache=redis_cache,
+            compression=redis_compression,
+            write_behind=redis_conf.write_behind,
+        )
         try:
             await redis_conn.connect()
         except ConnectionRefusedError as ce:
@@ -92,10 +120,15 @@ class PotiaBot(commands.Bot):
             fmt_prefixes[srv[9:]] = pre
 
         self.logger.info("Binding new prefixes...")
-        prefixes = functools.partial(prefixes_with_data, prefixes_data=fmt_prefixes, default=self.prefix)
-        self.command_prefix = prefixes
+        self.prefixes = PrefixTable(self.prefix, fmt_prefixes)
+        self.command_prefix = self.prefixes
         self.logger.info("Binding EventManager")
-        self.pevents = EventManager(self.loop)
+        event_transport = None
+        if self.config.events.transport == "redis":
+            self.logger.info(f"Using Redis event transport on channel: {self.config.events.channel}")
+            event_transport = RedisEventTransport(redis_conn, self.config.events.channel)
+        self.pevents = EventManager(self.loop, event_transport)
+        await self.pevents.connect()
         self.logger.info("Initialization completed!")
 
     async def login(self, *args, **kwargs):
@@ -103,6 +136,7 @@ class PotiaBot(commands.Bot):
         self.aiosession = aiohttp.ClientSession(
             headers={"User-Agent": f"PotiaBot/v{self.semver} (https://github.com/noaione/potia-muse)"}
         )
+        self.poller = HTTPPoller(self.aiosession)
 
         await self.initialize()
         await super().login(*args, **kwargs)
@@ -110,6 +144,11 @@ class PotiaBot(commands.Bot):
 
     async def close(self):
         """Close discord connection and all other stuff that I opened!"""
+        if self.pevents:
+            # Drain it while the cogs and the Discord connection is still usable by the callbacks
+            self.logger.info("Closing event manager...")
+            await self.pevents.close()
+
         for ext in list(self.extensions):
             with suppress(Exception):
                 self.unload_extension(ext)
@@ -118,10 +157,11 @@ class PotiaBot(commands.Bot):
             with suppress(Exception):
                 self.remove_cog(cog)
 
+        if self._modlog_queue:
+            self.logger.info("Sending the remaining modlog...")
+            await self._modlog_queue.close()
+
         await super().close()
-        if self.pevents:
-            self.logger.info("Closing event manager...")
-            await self.pevents.close()
 
         if self.aiosession:
             self.logger.info("Closing aiohttp Session...")
@@ -138,7 +178,10 @@ class PotiaBot(commands.Bot):
         """
         self.logger.info("---------------------------------------------------------------")
         self.logger.info("Bot has now established connection with Discord!")
+        self.startup.mark_ready()
         await self.modify_activity("🥐 | @author N4O")
+        if self.prefixes is not None:
+            self.prefixes.bind_user(self.user)
         self.logger.info("Binding modlog...")
         modlog_channel = self.get_channel(self.config.modlog_channel)
         if isinstance(modlog_channel, discord.TextChannel):
@@ -156,13 +199,20 @@ class PotiaBot(commands.Bot):
         self.logger.info("Client ID: {}".format(self.user.id))
         self.logger.info("Running PotiaBot version: {}".format(__version__))
         self.logger.info("---------------------------------------------------------------")
+        if not self.startup.is_complete:
+            # on_ready might be called again on reconnection, only report the first startup
+            await self.startup.wait_initialized()
+            self.logger.info("Startup timing:")
+            for line in self.startup.format_table().splitlines():
+                self.logger.info(line)
+            self.logger.info("---------------------------------------------------------------")
 
     def available_extensions(self):
         """Returns all available extensions"""
         ALL_EXTENSION_LIST = []
         IGNORED = ["__init__", "__main__"]
         current_path = self.fcwd.replace("\\", "/")
-        for (dirpath, _, filenames) in os.walk(os.path.join(self.fcwd, "cogs")):
+        for dirpath, _, filenames in os.walk(os.path.join(self.fcwd, "cogs")):
             for filename in filenames:
                 if filename.endswith(".py"):
                     dirpath = dirpath.replace("\\", "/")
@@ -187,7 +237,7 @@ class PotiaBot(commands.Bot):
                 self.logger.info(f"Skipping {extension}...")
                 continue
             try:
-                self.load_extension(extension)
+                self.startup.load(self, extension)
             except commands.ExtensionError as enoff:
                 self.logger.error(f"Failed to load {extension}")
                 self.echo_error(enoff)
@@ -206,8 +256,25 @@ class PotiaBot(commands.Bot):
         activity = discord.Game(name=f"{message} | p/info")
         await self.change_presence(activity=activity)
 
+    async def set_prefix(self, guild_id: int, prefix: Optional[str]):
+        """Change the prefix of a guild, use `None` to reset it to the default prefix"""
+        if prefix is None or prefix == self.prefix:
+            await self.redis.rm(f"potiapre_{guild_id}")
+            self.prefixes.remove(guild_id)
+        else:
+            await self.redis.set(f"potiapre_{guild_id}", prefix)
+            self.prefixes.set(guild_id, prefix)
+
     def set_modlog(self, channel: discord.TextChannel):
         self._modlog_channel = channel
+        if self._modlog_queue is not None:
+            self._modlog_queue.start(channel)
+
+    def modlog_stats(self) -> dict:
+        """Get the modlog queue depth and flush latency statistics"""
+        if self._modlog_queue is None:
+            return {}
+        return self._modlog_queue.stats()
 
     # Modlog feature
 
@@ -252,24 +319,21 @@ class PotiaBot(commands.Bot):
                 embed.timestamp = datetime.fromtimestamp(modlog.timestamp, tz=timezone.utc)
             modlog.embed = embed
 
-        # TODO: create more sophisicated method later
         real_message = modlog.message
         if not real_message:
             real_message = None
         self.logger.info(f"Content: {real_message}, embed: {modlog.embed}")
-        await self._modlog_channel.send(content=real_message, embed=modlog.embed)
+        # Sent in batch on the background, so the listener does not get blocked by the rate limit
+        self._modlog_queue.put(real_message, modlog.embed)
 
     # Helper
-    async def upload_ihateanime(self, content: AnyStr, filename: str = None):
-        timestamp = int(round(self.now().timestamp()))
-        if filename is None:
-            filename = f"PotiaBot.{timestamp}.txt"
-        else:
-            if not filename.endswith(".txt"):
-                filename += ".txt"
-        if not isinstance(content, bytes):
-            content = content.encode("utf-8")
-        async with aiohttp.ClientSession() as session:
+    async def _post_paste(self, content: bytes, filename: str) -> Optional[str]:
+        paste_conf = self.config.paste
+        timeout = aiohttp.ClientTimeout(total=paste_conf.timeout)
+        for attempt in range(paste_conf.retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(2 ** (attempt - 1))
+            # The form data cannot be reused after it's sent
             form_data = aiohttp.FormData()
             form_data.add_field(
                 name="file",
@@ -278,10 +342,34 @@ class PotiaBot(commands.Bot):
                 filename=filename,
             )
             try:
-                async with session.post("https://p.ihateani.me/upload", data=form_data) as resp:
+                async with self.aiosession.post(paste_conf.endpoint, data=form_data, timeout=timeout) as resp:
                     if resp.status == 200:
-                        res = await resp.text()
-                        return res
-            except aiohttp.ClientError:
-                return None
+                        return await resp.text()
+                    if resp.status < 500 and resp.status != 429:
+                        self.logger.error(f"Failed to upload paste, got HTTP {resp.status}")
+                        return None
+                    self.logger.warning(f"Failed to upload paste, got HTTP {resp.status}, retrying...")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"Failed to upload paste ({e!r}), retrying...")
+        self.logger.error(f"Failed to upload paste after {paste_conf.retries + 1} attempts")
         return None
+
+    async def upload_ihateanime(self, content: AnyStr, filename: str = None):
+        timestamp = int(round(self.now().timestamp()))
+        if filename is None:
+            filename = f"PotiaBot.{timestamp}.txt"
+        else:
+            if not filename.endswith(".txt"):
+                filename += ".txt"
+        if not isinstance(content, bytes):
+            content = content.encode("utf-8")
+        # Same content will always get the same paste, so dont upload it twice.
+        cache_key = f"potiapaste_{hashlib.sha256(content).hexdigest()}"
+        cached_url = await self.redis.get(cache_key)
+        if cached_url is not None:
+            self.logger.info(f"Reusing uploaded paste for {filename}: {cached_url}")
+            return cached_url
+        paste_url = await self._post_paste(content, filename)
+        if paste_url is not None:
+            await self.redis.setex(cache_key, paste_url, self.config.paste.cache_ttl)
+        return paste_url
@@ -0,0 +1,160 @@
+import zlib
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+__all__ = [
+    "CodecError",
+    "encode",
+    "decode",
+    "legacy_decode",
+    "compress",
+    "is_compressed",
+    "has_zstd",
+]
+
+# Version 1 of the codec, the first byte of every value is a type tag.
+# The tags are picked from 0xF5-0xFF since those bytes can never start a valid UTF-8 text,
+# so it will never be confused with a value written by the legacy text format.
+TAG_STR = 0xF5
+TAG_INT = 0xF6
+TAG_BYTES = 0xF7
+TAG_JSON = 0xF8
+TAG_MSGPACK = 0xF9
+# Compressed value, the decompressed payload is another tagged value
+TAG_ZLIB = 0xFA
+TAG_ZSTD = 0xFB
+_TAGS_V1 = (TAG_STR, TAG_INT, TAG_BYTES, TAG_JSON, TAG_MSGPACK, TAG_ZLIB, TAG_ZSTD)
+_TAGS_COMPRESSED = (TAG_ZLIB, TAG_ZSTD)
+
+_LEGACY_BYTES_MAGIC = "b2dntcode_"
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _default_hook(obj: Any):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError
+
+
+def encode(data: Any, use_msgpack: bool = False) -> bytes:
+    """Encode `data` into a type-tagged bytes
+
+    :param data: data to be encoded
+    :type data: Any
+    :param use_msgpack: Use msgpack instead of JSON for list/dict, defaults to False
+    :type use_msgpack: bool, optional
+    :return: The encoded data with the type tag as the first byte
+    :rtype: bytes
+    """
+    # bool is a subclass of int, let JSON handle it so it's still a bool when decoded.
+    if isinstance(data, int) and not isinstance(data, bool):
+        return bytes((TAG_INT,)) + str(data).encode("ascii")
+    if isinstance(data, str):
+        return bytes((TAG_STR,)) + data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes((TAG_BYTES,)) + bytes(data)
+    if use_msgpack:
+        if msgpack is None:
+            raise CodecError("msgpack is not installed!")
+        return bytes((TAG_MSGPACK,)) + msgpack.packb(data, default=_default_hook)
+    return bytes((TAG_JSON,)) + orjson.dumps(data, default=_default_hook)
+
+
+def has_zstd() -> bool:
+    return zstandard is not None
+
+
+def compress(encoded: bytes, algorithm: str = "zlib", level: Optional[int] = None) -> bytes:
+    """Compress an encoded value, the result is still a valid tagged value
+
+    :param encoded: The value returned by `encode()`
+    :type encoded: bytes
+    :param algorithm: `zlib` or `zstd`, defaults to `zlib`
+    :type algorithm: str, optional
+    :param level: The compression level, defaults to the algorithm default
+    :type level: Optional[int], optional
+    :return: The compressed value
+    :rtype: bytes
+    """
+    if algorithm == "zstd":
+        if zstandard is None:
+            raise CodecError("zstandard is not installed!")
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return bytes((TAG_ZSTD,)) + compressor.compress(encoded)
+    if algorithm == "zlib":
+        return bytes((TAG_ZLIB,)) + zlib.compress(encoded, -1 if level is None else level)
+    raise CodecError(f"Unknown compression algorithm: {algorithm}")
+
+
+def is_compressed(data: Optional[bytes]) -> bool:
+    return bool(data) and data[0] in _TAGS_COMPRESSED
+
+
+def legacy_decode(data: bytes) -> Any:
+    """Decode a value written by the old text format
+
+    For bytes, it's prepended with `b2dntcode_` since there's no reliable way to detect it.
+    """
+    parsed = data.decode("utf-8")
+    if parsed.isnumeric():
+        return int(parsed, 10)
+    if parsed.startswith(_LEGACY_BYTES_MAGIC):
+        parsed = parsed[len(_LEGACY_BYTES_MAGIC) :]
+        return parsed.encode("utf-8")
+    try:
+        parsed = orjson.loads(parsed)
+    except ValueError:
+        pass
+    return parsed
+
+
+def decode(data: Optional[bytes]) -> Optional[Any]:
+    """Decode back the data to the original data types
+
+    Value that does not have a type tag will be decoded with the legacy text format.
+
+    :param data: data to decode
+    :type data: Optional[bytes]
+    :return: Decoded data
+    :rtype: Any
+    """
+    if data is None:
+        return None
+    if not data or data[0] not in _TAGS_V1:
+        return legacy_decode(data)
+    tag = data[0]
+    if tag == TAG_ZLIB:
+        return decode(zlib.decompress(memoryview(data)[1:]))
+    if tag == TAG_ZSTD:
+        if zstandard is None:
+            raise CodecError("Received a zstd value but zstandard is not installed!")
+        return decode(zstandard.ZstdDecompressor().decompress(memoryview(data)[1:]))
+    if tag == TAG_JSON:
+        # Avoid copying the big payload
+        return orjson.loads(memoryview(data)[1:])
+    if tag == TAG_STR:
+        return data[1:].decode("utf-8")
+    if tag == TAG_INT:
+        return int(data[1:])
+    if tag == TAG_BYTES:
+        return data[1:]
+    if msgpack is None:
+        raise CodecError("Received a msgpack value but msgpack is not installed!")
+    return msgpack.unpackb(memoryview(data)[1:])
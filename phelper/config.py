@@ -1,5 +1,5 @@
 import argparse
-from typing import Dict, List, NamedTuple, Optional, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 import uuid
 from discord.enums import VoiceRegion
@@ -20,10 +20,65 @@ def str_or_none(value: Optional[str]) -> str:
     return value if value is not None else ""
 
 
+class RedisCacheConfig(NamedTuple):
+    ttls: Dict[str, float]
+    max_size: int = 1024
+    negative_ttl: float = 30.0
+    enabled: bool = True
+
+    @classmethod
+    def parse_config(cls, config: BotConfig):
+        ttls = config.get("ttls", {})
+        if not isinstance(ttls, dict):
+            raise ConfigParseError("redisdb.cache.ttls", "TTL cache harus berupa dict prefix -> detik!")
+        max_size = config.get("max_size", 1024)
+        negative_ttl = config.get("negative_ttl", 30.0)
+        enabled = config.get("enabled", True)
+        return cls(ttls, max_size, negative_ttl, enabled)
+
+    def serialize(self):
+        return {
+            "enabled": self.enabled,
+            "ttls": self.ttls,
+            "max_size": self.max_size,
+            "negative_ttl": self.negative_ttl,
+        }
+
+
+class RedisCompressionConfig(NamedTuple):
+    rules: Dict[str, Tuple[str, int]]
+    level: Optional[int] = None
+
+    @classmethod
+    def parse_config(cls, config: BotConfig):
+        level = config.get("level", None)
+        rules = {}
+        for prefix, rule in config.get("rules", {}).items():
+            algorithm = rule.get("algorithm", "zlib")
+            if algorithm not in ("zlib", "zstd"):
+                raise ConfigParseError(
+                    f"redisdb.compression.rules.{prefix}.algorithm", "Algoritma harus `zlib` atau `zstd`!"
+                )
+            rules[prefix] = (algorithm, rule.get("threshold", 4096))
+        return cls(rules, level)
+
+    def serialize(self):
+        return {
+            "level": self.level,
+            "rules": {
+                prefix: {"algorithm": algorithm, "threshold": threshold}
+                for prefix, (algorithm, threshold) in self.rules.items()
+            },
+        }
+
+
 class RedisConfig(NamedTuple):
     ip_hostname: str
     port: int
     password: Optional[str] = None
+    cache: Optional[RedisCacheConfig] = None
+    compression: Optional[RedisCompressionConfig] = None
+    write_behind: Optional[Dict[str, float]] = None
 
     @classmethod
     def parse_config(cls, config: BotConfig):
@@ -34,14 +89,32 @@ class RedisConfig(NamedTuple):
             )
         port = config.get("port", 6379)
         password = config.get("password", None)
-        return cls(ip_hostname, port, password)
+        cache = config.get("cache", None)
+        if cache is not None:
+            cache = RedisCacheConfig.parse_config(cache)
+        compression = config.get("compression", None)
+        if compression is not None:
+            compression = RedisCompressionConfig.parse_config(compression)
+        write_behind = config.get("write_behind", None)
+        if write_behind is None:
+            write_behind = {}
+        if not isinstance(write_behind, dict):
+            raise ConfigParseError("redisdb.write_behind", "Write-behind harus berupa dict prefix -> detik!")
+        return cls(ip_hostname, port, password, cache, compression, write_behind)
 
     def serialize(self):
-        return {
+        basis = {
             "ip_hostname": self.ip_hostname,
             "port": self.port,
             "password": self.password,
         }
+        if self.cache is not None:
+            basis["cache"] = self.cache.serialize()
+        if self.compression is not None:
+            basis["compression"] = self.compression.serialize()
+        if self.write_behind:
+            basis["write_behind"] = self.write_behind
+        return basis
 
 
 class PotiaLavalinkSpotifyNode(NamedTuple):
@@ -115,6 +188,48 @@ class PotiaLavalinkNodes(NamedTuple):
             base["spotify"] = self.spotify.serialize()
 
 
+class PotiaEventsConfig(NamedTuple):
+    transport: str = "local"
+    channel: str = "potia:events"
+
+    @classmethod
+    def parse_config(cls, config: BotConfig):
+        transport = config.get("transport", "local")
+        if transport not in ("local", "redis"):
+            raise ConfigParseError("events.transport", "Transport harus `local` atau `redis`!")
+        channel = config.get("channel", "potia:events")
+        return cls(transport, channel)
+
+    def serialize(self):
+        return {"transport": self.transport, "channel": self.channel}
+
+
+class PotiaPasteConfig(NamedTuple):
+    endpoint: str = "https://p.ihateani.me/upload"
+    timeout: float = 30.0
+    retries: int = 3
+    # The paste is valid for around 2.5 months, keep the cache below that
+    cache_ttl: int = 60 * 24 * 60 * 60
+
+    @classmethod
+    def parse_config(cls, config: BotConfig):
+        endpoint = config.get("endpoint", "https://p.ihateani.me/upload")
+        if not isinstance(endpoint, str) or not endpoint.startswith(("http://", "https://")):
+            raise ConfigParseError("paste.endpoint", "Endpoint harus berupa URL http/https!")
+        timeout = config.get("timeout", 30.0)
+        retries = config.get("retries", 3)
+        cache_ttl = config.get("cache_ttl", 60 * 24 * 60 * 60)
+        return cls(endpoint, timeout, retries, cache_ttl)
+
+    def serialize(self):
+        return {
+            "endpoint": self.endpoint,
+            "timeout": self.timeout,
+            "retries": self.retries,
+            "cache_ttl": self.cache_ttl,
+        }
+
+
 class PotiaArgParsed(NamedTuple):
     cogs_skip: List[str] = []
 
@@ -137,6 +252,8 @@ class PotiaBotConfig(NamedTuple):
     twitter_key: Optional[str]
     lavanodes: List[PotiaLavalinkNodes]
     openai_token: Optional[str]
+    events: PotiaEventsConfig = PotiaEventsConfig()
+    paste: PotiaPasteConfig = PotiaPasteConfig()
 
     @classmethod
     def parse_config(cls, config: BotConfig, parsed_ns: argparse.Namespace) -> "PotiaBotConfig":
@@ -151,6 +268,8 @@ class PotiaBotConfig(NamedTuple):
         for node in config.get("lavalink_nodes", []):
             lavalinks_nodes.append(PotiaLavalinkNodes.parse_config(node))
         openai_token = config.get("openai_token", None)
+        events_config = PotiaEventsConfig.parse_config(config.get("events", {}))
+        paste_config = PotiaPasteConfig.parse_config(config.get("paste", {}))
         argparsed = PotiaArgParsed.parse_argparse(parsed_ns)
 
         return cls(
@@ -162,6 +281,8 @@ class PotiaBotConfig(NamedTuple):
             twitter_key,
             lavalinks_nodes,
             openai_token,
+            events_config,
+            paste_config,
         )
 
     def serialize(self):
@@ -173,5 +294,7 @@ class PotiaBotConfig(NamedTuple):
             "twitter": self.twitter_key,
             "lavalink_nodes": [node.serialize() for node in self.lavanodes],
             "openai_token": str_or_none(self.openai_token),
+            "events": self.events.serialize(),
+            "paste": self.paste.serialize(),
         }
         return basis
@@ -0,0 +1,55 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Tuple, TypeVar
+
+__all__ = ["SnapshotDiff", "diff_snapshots", "key_by"]
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SnapshotDiff(NamedTuple):
+    added: List[Any]
+    removed: List[Any]
+    # The old and the new item that has the same key but different content
+    changed: List[Tuple[Any, Any]]
+    unchanged: List[Any]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.added and not self.removed and not self.changed
+
+
+def key_by(items: Iterable[T], key: Callable[[T], K]) -> Dict[K, T]:
+    """Make a keyed snapshot from a list, the last item wins if there's a duplicate key"""
+    return {key(item): item for item in items}
+
+
+def diff_snapshots(
+    old: Mapping[K, T], new: Mapping[K, T], same: Callable[[T, T], bool] = lambda a, b: a == b
+) -> SnapshotDiff:
+    """Compare two keyed snapshots in O(n)
+
+    The order of `added`, `changed` and `unchanged` follow `new`, and `removed` follow `old`.
+
+    :param old: The previous snapshot
+    :type old: Mapping[K, T]
+    :param new: The current snapshot
+    :type new: Mapping[K, T]
+    :param same: A function to check if two items with the same key have the same content,
+                 defaults to `==`
+    :type same: Callable[[T, T], bool], optional
+    :return: The added, removed, changed and unchanged items
+    :rtype: SnapshotDiff
+    """
+    added: List[T] = []
+    changed: List[Tuple[T, T]] = []
+    unchanged: List[T] = []
+    for item_key, item in new.items():
+        previous = old.get(item_key)
+        if previous is None:
+            added.append(item)
+        elif same(previous, item):
+            unchanged.append(previous)
+        else:
+            changed.append((previous, item))
+    removed = [item for item_key, item in old.items() if item_key not in new]
+    return SnapshotDiff(added, removed, changed, unchanged)
@@ -1,9 +1,15 @@
+import asyncio
+import logging
+import time
+from collections import deque
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional
+from typing import Any, Deque, Dict, List, Optional
 
 import discord
 
+__all__ = ["PotiaModLogAction", "PotiaModLog", "ModLogQueue"]
+
 
 class PotiaModLogAction(Enum):
     MEMBER_JOIN = 0
@@ -77,3 +83,256 @@ class PotiaModLog:
     def embed(self, embed: discord.Embed):
         if isinstance(embed, discord.Embed):
             self._embed = embed
+
+
+class _QueuedModLog:
+    __slots__ = ("content", "embed", "queued_at")
+
+    def __init__(self, content: Optional[str], embed: Optional[discord.Embed]):
+        self.content = content
+        self.embed = embed
+        self.queued_at = time.perf_counter()
+
+
+class ModLogQueue:
+    """A background queue that send the modlog in batch to the modlog channel
+
+    Up to `max_embeds` embeds are packed into a single message, the batch is sent
+    when it's full or after `flush_interval` seconds since the first queued log.
+    A failed batch is retried with backoff before the next batch is sent, so the order is kept.
+
+    :param loop: The event loop
+    :type loop: asyncio.AbstractEventLoop
+    :param max_embeds: Maximum embeds per message, defaults to 10 (Discord limit)
+    :type max_embeds: int, optional
+    :param flush_interval: How long to wait for more logs before sending, defaults to 1.5 seconds
+    :type flush_interval: float, optional
+    :param max_retries: How many times a batch is retried before dropped, defaults to 5
+    :type max_retries: int, optional
+    """
+
+    # Discord limits for a single message
+    MAX_EMBEDS = 10
+    MAX_EMBED_CHARS = 6000
+    MAX_BACKOFF = 60.0
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop = None,
+        max_embeds: int = MAX_EMBEDS,
+        flush_interval: float = 1.5,
+        max_retries: int = 5,
+    ):
+        self.logger = logging.getLogger("Potia.ModLogQueue")
+        self._loop = loop or asyncio.get_event_loop()
+        self._max_embeds = min(max(max_embeds, 1), self.MAX_EMBEDS)
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+
+        self.channel: Optional[discord.TextChannel] = None
+        self._queue: Deque[_QueuedModLog] = deque()
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self._sent_messages = 0
+        self._sent_logs = 0
+        self._retries = 0
+        self._dropped = 0
+        # Flush latency (send duration) and the time a log spent on the queue before sent, in seconds
+        self._flush_latency: Deque[float] = deque(maxlen=256)
+        self._queue_latency: Deque[float] = deque(maxlen=256)
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def start(self, channel: discord.TextChannel):
+        """Start sending the queued log to the channel"""
+        self.channel = channel
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._worker(), name="PotiaModLogQueue")
+        if self._queue:
+            self._wakeup.set()
+
+    def put(self, content: Optional[str], embed: Optional[discord.Embed]):
+        """Queue a log to be sent, this does not wait for the log to be sent"""
+        if self._closing:
+            self.logger.warning("Modlog queue is closing, dropping log...")
+            self._dropped += 1
+            return
+        self._queue.append(_QueuedModLog(content, embed))
+        self._wakeup.set()
+        if len(self._queue) >= self._max_embeds:
+            self._full.set()
+
+    def _take_batch(self) -> List[_QueuedModLog]:
+        batch: List[_QueuedModLog] = []
+        total_chars = 0
+        while self._queue and len(batch) < self._max_embeds:
+            modlog = self._queue[0]
+            if batch and modlog.content:
+                # The content is shown on top of every embed, so it must start a new message.
+                break
+            embed_chars = self._embed_size(modlog.embed)
+            if batch and total_chars + embed_chars > self.MAX_EMBED_CHARS:
+                break
+            batch.append(self._queue.popleft())
+            total_chars += embed_chars
+        return batch
+
+    @staticmethod
+    def _embed_size(embed: Optional[discord.Embed]) -> int:
+        if embed is None:
+            return 0
+        try:
+            return len(embed)
+        except Exception:
+            # A malformed embed, let the send fail and drop it
+            return 0
+
+    async def _wait_for_batch(self):
+        await self._wakeup.wait()
+        if self._closing or len(self._queue) >= self._max_embeds:
+            return
+        remaining = self._flush_interval - (time.perf_counter() - self._queue[0].queued_at)
+        if remaining <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._full.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self):
+        while True:
+            await self._wait_for_batch()
+            while self._queue and self.channel is not None:
+                batch = self._take_batch()
+                try:
+                    await self._send_batch(batch)
+                except Exception as e:
+                    # Never let the worker die, or the modlog stop for the rest of the process
+                    self.logger.error(f"Failed to send {len(batch)} modlog, dropping...", exc_info=e)
+                    self._dropped += len(batch)
+                if not self._closing and len(self._queue) < self._max_embeds:
+                    # Wait for the rest to fill up the next message
+                    break
+            if not self._queue:
+                self._wakeup.clear()
+            if len(self._queue) < self._max_embeds:
+                self._full.clear()
+            if self._closing and not self._queue:
+                return
+
+    async def _send_batch(self, batch: List[_QueuedModLog]):
+        content = batch[0].content or None
+        embeds = [modlog.embed for modlog in batch if modlog.embed is not None]
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                await self.channel.send(content=content, embeds=embeds)
+            except (discord.Forbidden, discord.NotFound) as e:
+                # Retrying will not help
+                self.logger.error(f"Failed to send {len(batch)} modlog, dropping...", exc_info=e)
+                self._dropped += len(batch)
+                return
+            except discord.HTTPException as e:
+                attempt += 1
+                if attempt > self._max_retries or (400 <= e.status < 500 and e.status != 429):
+                    self.logger.error(f"Failed to send {len(batch)} modlog, dropping...", exc_info=e)
+                    self._dropped += len(batch)
+                    return
+                delay = self._retry_delay(e, attempt)
+                self._retries += 1
+                self.logger.warning(
+                    f"Failed to send modlog (HTTP {e.status}), retrying in {delay:.1f}s "
+                    f"[{attempt}/{self._max_retries}]"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except (OSError, asyncio.TimeoutError) as e:
+                # Connection error, aiohttp.ClientConnectionError is also an OSError
+                attempt += 1
+                if attempt > self._max_retries:
+                    self.logger.error(f"Failed to send {len(batch)} modlog, dropping...", exc_info=e)
+                    self._dropped += len(batch)
+                    return
+                delay = min(2 ** (attempt - 1), self.MAX_BACKOFF)
+                self._retries += 1
+                self.logger.warning(
+                    f"Failed to send modlog ({e!r}), retrying in {delay:.1f}s [{attempt}/{self._max_retries}]"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                # Anything else is a bug in the log itself, drop it so the worker keep running
+                self.logger.error(f"Unexpected error sending {len(batch)} modlog, dropping...", exc_info=e)
+                self._dropped += len(batch)
+                return
+            finished = time.perf_counter()
+            self._flush_latency.append(finished - start)
+            for modlog in batch:
+                self._queue_latency.append(finished - modlog.queued_at)
+            self._sent_messages += 1
+            self._sent_logs += len(batch)
+            return
+
+    def _retry_delay(self, error: discord.HTTPException, attempt: int) -> float:
+        if error.status == 429:
+            # Use the rate limit bucket reset time if Discord told us
+            retry_after = getattr(error, "retry_after", None)
+            if retry_after is None and error.response is not None:
+                retry_after = error.response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+        return min(2 ** (attempt - 1), self.MAX_BACKOFF)
+
+    @staticmethod
+    def _percentile(samples: Deque[float], percentile: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        index = min(int(round(percentile * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the queue depth, throughput and latency (in seconds) of the queue"""
+        return {
+            "depth": len(self._queue),
+            "messages": self._sent_messages,
+            "logs": self._sent_logs,
+            "retries": self._retries,
+            "dropped": self._dropped,
+            "flush_p50": self._percentile(self._flush_latency, 0.5),
+            "flush_p95": self._percentile(self._flush_latency, 0.95),
+            "queued_p50": self._percentile(self._queue_latency, 0.5),
+            "queued_p95": self._percentile(self._queue_latency, 0.95),
+        }
+
+    async def close(self, timeout: float = 10.0):
+        """Send the remaining log and stop the queue, the log that is not sent after `timeout` is dropped"""
+        self._closing = True
+        if self._task is None or self._task.done():
+            if self._queue:
+                self.logger.warning(f"Modlog channel is not ready, dropping {len(self._queue)} log...")
+                self._dropped += len(self._queue)
+                self._queue.clear()
+            return
+        self._wakeup.set()
+        self._full.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Timed out sending the modlog, dropping {len(self._queue)} log...")
+            self._dropped += len(self._queue)
+            self._queue.clear()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
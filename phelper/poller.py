@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+import aiohttp
+import orjson
+
+__all__ = ["HTTPPoller", "PollError", "PollResult"]
+
+
+class PollError(ValueError):
+    def __init__(self, url: str, reason: str, status: Optional[int] = None):
+        self.url = url
+        self.status = status
+        super().__init__(f"Failed to poll {url}: {reason}")
+
+
+class PollResult(NamedTuple):
+    changed: bool
+    # The parsed JSON, always `None` if it's unchanged
+    data: Any = None
+    status: int = 200
+
+
+class _PollState:
+    __slots__ = ("etag", "last_modified", "body_hash", "size")
+
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.body_hash: Optional[bytes] = None
+        self.size = 0
+
+
+class _PollCounter:
+    __slots__ = ("requests", "not_modified", "same_body", "changed", "errors", "bytes_saved")
+
+    def __init__(self):
+        self.requests = 0
+        # Server replied 304, the body is not downloaded at all
+        self.not_modified = 0
+        # Server replied with the same body, only the parsing is skipped
+        self.same_body = 0
+        self.changed = 0
+        self.errors = 0
+        self.bytes_saved = 0
+
+    def serialize(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "hits": self.not_modified + self.same_body,
+            "misses": self.changed,
+            "not_modified": self.not_modified,
+            "same_body": self.same_body,
+            "errors": self.errors,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+class HTTPPoller:
+    """A JSON polling client that tell if the response is unchanged since the last poll
+
+    The ETag and Last-Modified validators and a hash of the body is stored per poll key,
+    so the caller can skip parsing and processing the same data twice.
+    Different callers that poll the same URL should use a different `key`.
+
+    :param session: The shared aiohttp session
+    :type session: aiohttp.ClientSession
+    :param timeout: The total timeout of a request, defaults to 20 seconds
+    :type timeout: float, optional
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, timeout: float = 20.0):
+        self.logger = logging.getLogger("Potia.HTTPPoller")
+        self._session = session
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._states: Dict[str, _PollState] = {}
+        self._counters: Dict[str, _PollCounter] = {}
+
+    async def poll_json(
+        self,
+        url: str,
+        key: Optional[str] = None,
+        params: Optional[Mapping[str, str]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> PollResult:
+        """Request a JSON endpoint, and only parse it if it's changed since the last poll of `key`
+
+        :param url: The URL to request
+        :type url: str
+        :param key: The poll key to store the state, defaults to the URL
+        :type key: Optional[str], optional
+        :param params: The query parameters
+        :type params: Optional[Mapping[str, str]], optional
+        :param headers: Extra request headers
+        :type headers: Optional[Mapping[str, str]], optional
+        :raises PollError: If the request failed or the response is not a JSON
+        :return: The poll result
+        :rtype: PollResult
+        """
+        key = key or url
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _PollState()
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = _PollCounter()
+        counter.requests += 1
+
+        request_headers = dict(headers or {})
+        if state.etag is not None:
+            request_headers["If-None-Match"] = state.etag
+        if state.last_modified is not None:
+            request_headers["If-Modified-Since"] = state.last_modified
+
+        try:
+            async with self._session.get(
+                url, params=params, headers=request_headers, timeout=self._timeout
+            ) as resp:
+                if resp.status == 304:
+                    counter.not_modified += 1
+                    counter.bytes_saved += state.size
+                    return PollResult(False, None, resp.status)
+                if resp.status != 200:
+                    raise PollError(url, f"got HTTP {resp.status}", resp.status)
+                if "json" not in resp.content_type:
+                    raise PollError(url, f"got {resp.content_type} instead of JSON", resp.status)
+                body = await resp.read()
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            counter.errors += 1
+            raise PollError(url, repr(e)) from e
+        except PollError:
+            counter.errors += 1
+            raise
+
+        body_hash = hashlib.blake2b(body, digest_size=16).digest()
+        if body_hash == state.body_hash:
+            state.etag = etag
+            state.last_modified = last_modified
+            counter.same_body += 1
+            return PollResult(False, None, 200)
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            # Dont store the validators, or the next poll will get a 304 and never see the valid data
+            counter.errors += 1
+            raise PollError(url, "invalid JSON response", 200) from e
+        state.etag = etag
+        state.last_modified = last_modified
+        state.body_hash = body_hash
+        state.size = len(body)
+        counter.changed += 1
+        return PollResult(True, data, 200)
+
+    def forget(self, key: str):
+        """Forget the last response of `key`, the next poll will be treated as changed
+
+        Use this if the caller failed to fully process the last changed response.
+        """
+        self._states.pop(key, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the hits, misses, errors and bytes saved of every poll key"""
+        return {key: counter.serialize() for key, counter in self._counters.items()}
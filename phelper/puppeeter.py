@@ -2,13 +2,12 @@ import asyncio
 import json
 import logging
 from io import BytesIO
-from typing import Any, Dict, NamedTuple, Union
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Union
 
-from PIL import Image
-from pyppeteer.browser import Browser
-from pyppeteer.launcher import Launcher
-from pyppeteer.page import Page
-from websockets.exceptions import ConnectionClosedError
+# pyppeteer and PIL is slow to import, only import it when the generator is used
+if TYPE_CHECKING:
+    from pyppeteer.browser import Browser
+    from pyppeteer.page import Page
 
 
 class GenerateFailure(Exception):
@@ -32,9 +31,11 @@ class PuppeeterGeneratorBase(NamedTuple):
 
 class PuppeeterGenerator:
     def __init__(self, loop: asyncio.AbstractEventLoop = None) -> None:
-        self._browser: Browser = None
-        self._page_navigator: Dict[str, Dict[str, Union[Page, int]]] = {}
-        self._page: Page = None
+        from pyppeteer.launcher import Launcher
+
+        self._browser: "Browser" = None
+        self._page_navigator: Dict[str, Dict[str, Union["Page", int]]] = {}
+        self._page: "Page" = None
         self._loop = loop
         if not self._loop:
             self._loop = asyncio.get_event_loop()
@@ -60,6 +61,8 @@ class PuppeeterGenerator:
         self.logger.info("Card generator ready!")
 
     async def close(self):
+        from websockets.exceptions import ConnectionClosedError
+
         self.logger.info("Closing down browser and cleaning up...")
         if not self._launcher.chromeClosed:
             try:
@@ -94,7 +97,7 @@ class PuppeeterGenerator:
         except (ValueError, KeyError, IndexError, AttributeError):
             raise GenerateFailure(f"Cannot find {name} on pages navigation list")
 
-        real_page: Page = page_data["p"]
+        real_page: "Page" = page_data["p"]
         max_width: int = page_data["mw"]
         self.logger.info("Evaluating expression and function...")
         generated_eval = self._generate_expression(data.serialize())
@@ -112,6 +115,8 @@ class PuppeeterGenerator:
         self.logger.info("Taking a screenshot of the page and cropping it...")
         screenies = await real_page.screenshot()
 
+        from PIL import Image
+
         im = Image.open(BytesIO(screenies))
         im = im.crop((0, 0, max_width, dimensions["height"]))
         img_byte_arr = BytesIO()
@@ -1,19 +1,270 @@
 import asyncio
+import functools
 import logging
-import uuid
-from typing import Any, Dict, List, Optional
+import time
+from fnmatch import fnmatchcase
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 
 import aioredis
-import orjson
-from bson import ObjectId
 
-__all__ = ["RedisBridge"]
+from .codec import compress, decode, encode, has_zstd, is_compressed
 
+__all__ = ["RedisBridge", "RedisLocalCache", "RedisCompression"]
 
-def BSONObjectEncoder(obj: Any):
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    raise TypeError
+# Marker for a key that is not on the local cache, since `None` is a valid cached (missing) value
+_NOT_CACHED = object()
+
+
+class RedisLocalCache:
+    """A small in-process LRU cache for :class:`RedisBridge`
+
+    Only keys matching one of the prefixes in `ttls` will be cached, the longest
+    matching prefix decide the TTL (in seconds) of the key.
+
+    The cache store the raw bytes from Redis, so every hit is decoded again
+    and the caller can safely mutate the returned data.
+
+    Missing keys are cached too (negative caching) for `negative_ttl` seconds,
+    set it to `0` to disable it.
+    """
+
+    # How long to wait for the keyspace notification of our own write before forgetting it
+    OWN_WRITE_TTL = 30.0
+
+    def __init__(self, ttls: Dict[str, float], max_size: int = 1024, negative_ttl: float = 30.0):
+        # Sort it so the longest prefix got matched first
+        self._ttls: List[Tuple[str, float]] = sorted(ttls.items(), key=lambda x: len(x[0]), reverse=True)
+        self._max_size = max(1, max_size)
+        self._negative_ttl = negative_ttl
+        self._store: "OrderedDict[str, Tuple[float, Optional[bytes]]]" = OrderedDict()
+        # Write done by this process, used to ignore our own keyspace notification.
+        # Key -> deadline of each write, ordered by the latest write.
+        self._own_writes: Dict[str, List[float]] = {}
+        # Key -> amount of running GET and the generation of the key, bumped on every change while it's read.
+        # A GET only cache the value if the generation is still the same when it's done.
+        self._readers: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def prefixes(self) -> List[str]:
+        return [prefix for prefix, _ in self._ttls]
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _ttl_for(self, key: str) -> Optional[float]:
+        for prefix, ttl in self._ttls:
+            if key.startswith(prefix):
+                return ttl
+        return None
+
+    def is_cacheable(self, key: str) -> bool:
+        return self._ttl_for(key) is not None
+
+    def get(self, key: str) -> Any:
+        """Get the raw value of a key, return `_NOT_CACHED` if it's not cached or expired"""
+        cached = self._store.get(key)
+        if cached is None:
+            if self.is_cacheable(key):
+                self.misses += 1
+            return _NOT_CACHED
+        expires_at, raw_data = cached
+        if expires_at < time.monotonic():
+            del self._store[key]
+            self.misses += 1
+            return _NOT_CACHED
+        self._store.move_to_end(key)
+        if raw_data is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return raw_data
+
+    def put(self, key: str, raw_data: Optional[bytes], ttl: Optional[float] = None) -> None:
+        """Put the raw value of a key to the cache, `None` means the key is missing"""
+        self._bump(key)
+        self._store_raw(key, raw_data, ttl)
+
+    def _store_raw(self, key: str, raw_data: Optional[bytes], ttl: Optional[float] = None) -> None:
+        key_ttl = self._ttl_for(key)
+        if key_ttl is None:
+            return
+        if raw_data is None:
+            key_ttl = self._negative_ttl
+        if ttl is not None:
+            # The key itself has an expiration on Redis, dont keep it longer than that.
+            key_ttl = min(key_ttl, ttl)
+        if key_ttl <= 0:
+            self._store.pop(key, None)
+            return
+        self._store[key] = (time.monotonic() + key_ttl, raw_data)
+        self._store.move_to_end(key)
+        while len(self._store) > self._max_size:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        self._bump(key)
+        if self._store.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        for key in self._readers.keys():
+            self._bump(key)
+        self._store.clear()
+        self._own_writes.clear()
+
+    def _bump(self, key: str) -> None:
+        if key in self._readers:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def begin_read(self, key: str) -> int:
+        """Mark the start of a GET of a key, return the generation to be passed to :meth:`end_read`"""
+        self._readers[key] = self._readers.get(key, 0) + 1
+        return self._generations.get(key, 0)
+
+    def end_read(self, key: str, generation: int, raw_data: Optional[bytes], success: bool = True) -> None:
+        """Cache the value of a GET, unless the key is changed while it's being read"""
+        if success and self._generations.get(key, 0) == generation:
+            self._store_raw(key, raw_data)
+        readers = self._readers.get(key, 1) - 1
+        if readers < 1:
+            self._readers.pop(key, None)
+            self._generations.pop(key, None)
+        else:
+            self._readers[key] = readers
+
+    def mark_own_write(self, key: str) -> None:
+        if not self.is_cacheable(key):
+            return
+        now = time.monotonic()
+        deadlines = self._own_writes.pop(key, [])
+        deadlines.append(now + self.OWN_WRITE_TTL)
+        self._own_writes[key] = deadlines
+        # The notification might never come, drop the oldest write so this does not grow forever
+        while self._own_writes:
+            oldest_key = next(iter(self._own_writes))
+            if len(self._own_writes) <= self._max_size and self._own_writes[oldest_key][-1] > now:
+                break
+            del self._own_writes[oldest_key]
+
+    def consume_own_write(self, key: str) -> bool:
+        deadlines = self._own_writes.get(key)
+        if not deadlines:
+            return False
+        now = time.monotonic()
+        while deadlines and deadlines[0] <= now:
+            deadlines.pop(0)
+        consumed = bool(deadlines)
+        if consumed:
+            deadlines.pop(0)
+        if not deadlines:
+            del self._own_writes[key]
+        return consumed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the cache statistics"""
+        total = self.hits + self.negative_hits + self.misses
+        hit_ratio = 0.0
+        if total > 0:
+            hit_ratio = (self.hits + self.negative_hits) / total
+        return {
+            "size": len(self._store),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": hit_ratio,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class RedisCompression:
+    """Opt-in compression for big values of :class:`RedisBridge`
+
+    `rules` is a dict of key prefix to a tuple of the algorithm (`zlib` or `zstd`)
+    and the minimum size (in bytes) of the encoded value before it got compressed.
+    The longest matching prefix is used.
+
+    The compression is marked on the value header, so reading it is transparent
+    even for process that does not have this enabled.
+    """
+
+    def __init__(self, rules: Dict[str, Tuple[str, int]], level: Optional[int] = None):
+        self.logger = logging.getLogger("naoTimes.Redis.Compression")
+        parsed_rules: List[Tuple[str, str, int]] = []
+        for prefix, (algorithm, threshold) in rules.items():
+            if algorithm == "zstd" and not has_zstd():
+                self.logger.warning(f"zstandard is not installed, using zlib for {prefix} instead")
+                algorithm = "zlib"
+            parsed_rules.append((prefix, algorithm, max(0, threshold)))
+        self._rules = sorted(parsed_rules, key=lambda x: len(x[0]), reverse=True)
+        self._level = level
+
+        self.compressed = 0
+        self.skipped = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.compress_time = 0.0
+        self.decompressed = 0
+        self.decompress_time = 0.0
+
+    def _rule_for(self, key: str) -> Optional[Tuple[str, int]]:
+        for prefix, algorithm, threshold in self._rules:
+            if key.startswith(prefix):
+                return algorithm, threshold
+        return None
+
+    def maybe_compress(self, key: str, encoded: bytes) -> bytes:
+        """Compress the encoded value if the key has a rule and it's big enough"""
+        rule = self._rule_for(key)
+        if rule is None:
+            return encoded
+        algorithm, threshold = rule
+        if len(encoded) < threshold:
+            return encoded
+        start = time.perf_counter()
+        compressed = compress(encoded, algorithm, self._level)
+        self.compress_time += time.perf_counter() - start
+        if len(compressed) >= len(encoded):
+            # Not worth it, keep it as is.
+            self.skipped += 1
+            return encoded
+        self.compressed += 1
+        self.raw_bytes += len(encoded)
+        self.compressed_bytes += len(compressed)
+        return compressed
+
+    def timed_decode(self, data: bytes) -> Any:
+        start = time.perf_counter()
+        decoded = decode(data)
+        self.decompress_time += time.perf_counter() - start
+        self.decompressed += 1
+        return decoded
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the compression statistics"""
+        ratio = 0.0
+        if self.raw_bytes > 0:
+            ratio = self.compressed_bytes / self.raw_bytes
+        return {
+            "compressed": self.compressed,
+            "skipped": self.skipped,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "ratio": ratio,
+            "compress_time": self.compress_time,
+            "decompressed": self.decompressed,
+            "decompress_time": self.decompress_time,
+        }
 
 
 class RedisBridge:
@@ -49,7 +300,18 @@ class RedisBridge:
     ```
     """
 
-    def __init__(self, host: str, port: int, password: str = None, loop: asyncio.AbstractEventLoop = None):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str = None,
+        loop: asyncio.AbstractEventLoop = None,
+        chunk_size: int = 500,
+        cache: Optional[RedisLocalCache] = None,
+        use_msgpack: bool = False,
+        compression: Optional[RedisCompression] = None,
+        write_behind: Optional[Dict[str, float]] = None,
+    ):
         if loop is None:
             self._loop = asyncio.get_event_loop()
         else:
@@ -67,111 +329,231 @@ class RedisBridge:
         self.logger = logging.getLogger("naoTimes.Redis")
         self._is_connected = False
 
-        self._need_execution = []
+        # Amount of operations that are still running, `close()` wait for it to be drained
+        self._in_flight = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
         self._is_stopping = False
+        # How many keys should be fetched per MGET call on bulk reads
+        self._chunk_size = max(1, chunk_size)
 
-    def lock(self, key: str):
-        self._need_execution.append(key)
+        self._use_msgpack = use_msgpack
+        self._compression = compression
+        self._cache = cache
+        self._cache_listener: Optional[asyncio.Task] = None
 
-    def unlock(self, key: str):
-        try:
-            self._need_execution.remove(key)
-        except ValueError:
-            pass
+        # Key prefix -> coalescing window (in seconds) of `set()`, longest prefix first.
+        self._write_behind: List[Tuple[str, float]] = sorted(
+            (write_behind or {}).items(), key=lambda x: len(x[0]), reverse=True
+        )
+        # Key -> (latest encoded value, flush timer), each pending key hold one in-flight slot.
+        self._pending_writes: Dict[str, Tuple[bytes, asyncio.TimerHandle]] = {}
+        # Key -> encoded value that is being written by `_flush_key()`, readable until the write is done.
+        self._flushing_writes: Dict[str, bytes] = {}
+        # Key -> the latest flush task, a new flush/delete of the same key wait for it to keep the order.
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self._coalesced_writes = 0
 
-    @staticmethod
-    def _clean_bson_objectid(objects: dict) -> dict:
-        readjusted_data = {}
-        for key, value in objects.items():
-            if isinstance(value, ObjectId):
-                continue
-            readjusted_data[key] = value
-        return readjusted_data
+    def lock(self):
+        self._in_flight += 1
+        self._drained.clear()
 
-    def stringify(self, data: Any) -> str:
-        """Stringify `data`
+    def unlock(self):
+        if self._in_flight > 0:
+            self._in_flight -= 1
+        if self._in_flight == 0:
+            self._drained.set()
 
-        :param data: data to be turn into a string
+    @property
+    def in_flight(self) -> int:
+        """The amount of operations that are currently running"""
+        return self._in_flight
+
+    def stringify(self, data: Any) -> bytes:
+        """Encode `data` into a type-tagged bytes
+
+        :param data: data to be encoded
         :type data: Any
-        :return: A stringified `data`
-        :rtype: str
+        :return: An encoded `data`
+        :rtype: bytes
         """
-        if isinstance(data, bytes):
-            data = data.decode("utf-8")
-            # Prepend magic code
-            data = "b2dntcode_" + data
-        elif isinstance(data, int):
-            data = str(data)
-        elif isinstance(data, (list, tuple, dict)):
-            if isinstance(data, dict):
-                data = self._clean_bson_objectid(data)
-            elif isinstance(data, list):
-                _data = []
-                for d in data:
-                    if isinstance(d, dict):
-                        _data.append(self._clean_bson_objectid(d))
-                    else:
-                        _data.append(d)
-                data = _data
-            data = orjson.dumps(data, default=BSONObjectEncoder).decode("utf-8")
-        return data
+        return encode(data, self._use_msgpack)
 
-    @staticmethod
-    def to_original(data: Optional[bytes]) -> Optional[Any]:
+    def _encode_for(self, key: str, data: Any) -> bytes:
+        encoded = self.stringify(data)
+        if self._compression is not None:
+            encoded = self._compression.maybe_compress(key, encoded)
+        return encoded
+
+    def to_original(self, data: Optional[bytes]) -> Optional[Any]:
         """Convert back data to the possible original data types
 
-        For bytes, you need to prepend with `b2dntcode_`
-        since there's no reliable way to detect it.
+        Value written by the old text format and compressed value are supported.
 
         :param data: data to convert to original type
-        :type data: Optional[str]
+        :type data: Optional[bytes]
         :return: Converted data
         :rtype: Any
         """
-        if data is None:
-            return None
-        parsed = data.decode("utf-8")
-        if parsed.isnumeric():
-            return int(parsed, 10)
-        if parsed.startswith("b2dntcode_"):
-            parsed = parsed[10:]
-            return parsed.encode("utf-8")
-        try:
-            parsed = orjson.loads(parsed)
-        except ValueError:
-            pass
-        return parsed
+        if self._compression is not None and is_compressed(data):
+            return self._compression.timed_decode(data)
+        return decode(data)
+
+    @staticmethod
+    def _chunked(data: List[str], size: int):
+        for i in range(0, len(data), size):
+            yield data[i : i + size]
+
+    async def _bulk_get(self, all_keys: List[str], chunk_size: int = None) -> List[Any]:
+        """Fetch the values of multiple keys in chunked `MGET` batches
+
+        The returned values are in the same order as `all_keys`,
+        missing keys or failed batches will be returned as `None`
+
+        :param all_keys: The keys to fetch
+        :type all_keys: List[str]
+        :param chunk_size: The amount of keys per `MGET` call, defaults to the bridge chunk size
+        :type chunk_size: int, optional
+        :return: The converted values of each key
+        :rtype: List[Any]
+        """
+        if chunk_size is None:
+            chunk_size = self._chunk_size
+        chunk_size = max(1, chunk_size)
+        all_values = []
+        for chunked_keys in self._chunked(all_keys, chunk_size):
+            try:
+                raw_values = await self._conn.mget(chunked_keys)
+            except aioredis.RedisError:
+                raw_values = [None] * len(chunked_keys)
+            all_values.extend(map(self.to_original, raw_values))
+        return all_values
 
     @property
     def is_stopping(self) -> bool:
         """Is the connection is being stopped or not?"""
         return self._is_stopping
 
+    @property
+    def cache(self) -> Optional[RedisLocalCache]:
+        """The local cache, `None` if it's not enabled"""
+        return self._cache
+
+    def compression_stats(self) -> Dict[str, Any]:
+        """Get the compression ratio and CPU time statistics, empty if the compression is not enabled"""
+        if self._compression is None:
+            return {}
+        return self._compression.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get the local cache hit/miss statistics, empty if the cache is not enabled"""
+        if self._cache is None:
+            return {}
+        return self._cache.stats()
+
     async def connect(self):
         """Initialize the connection to the RedisDB
 
         Please execute this function after creating the `claas`
         """
         self._is_connected = True
+        if self._cache is not None and self._cache_listener is None:
+            if not await self._has_keyspace_notification():
+                self.logger.warning(
+                    "Keyspace notification is not enabled on the Redis server, disabling the local cache! "
+                    "Set `notify-keyspace-events K$gx` to use it."
+                )
+                self._cache = None
+                return
+            self._cache_listener = self._loop.create_task(
+                self._listen_keyspace(), name="naoTimes.Redis: keyspace-listener"
+            )
+
+    async def _has_keyspace_notification(self) -> bool:
+        """Check if the server send the keyspace notification needed by the local cache"""
+        try:
+            config = await self._conn.config_get("notify-keyspace-events")
+        except aioredis.RedisError as e:
+            self.logger.warning(f"Failed to check notify-keyspace-events: {e!r}")
+            return False
+        flags = config.get("notify-keyspace-events", config.get(b"notify-keyspace-events", b""))
+        if isinstance(flags, bytes):
+            flags = flags.decode("utf-8")
+        if "A" in flags:
+            # `A` is an alias of every event class
+            flags += "g$"
+        return "K" in flags and "g" in flags and "$" in flags
+
+    async def _listen_keyspace(self):
+        """Invalidate the local cache when another process modify a cached key
+
+        This need the keyspace notification to be enabled on the Redis server,
+        for example: `notify-keyspace-events K$gx`
+        """
+        db_num = self._pool.connection_kwargs.get("db", 0)
+        channel_prefix = f"__keyspace@{db_num}__:"
+        patterns = [f"{channel_prefix}{prefix}*" for prefix in self._cache.prefixes]
+        if not patterns:
+            return
+        pubsub = self._conn.pubsub()
+        try:
+            await pubsub.psubscribe(*patterns)
+            self.logger.info(f"Listening to keyspace notification for {len(patterns)} prefixes")
+            while not self._is_stopping:
+                try:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                except aioredis.RedisError:
+                    # Connection dropped, anything could be changed so drop everything.
+                    self.logger.warning("Keyspace listener got disconnected, clearing local cache...")
+                    self._cache.clear()
+                    await asyncio.sleep(1.0)
+                    continue
+                if message is None:
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode("utf-8")
+                event = message["data"]
+                if isinstance(event, bytes):
+                    event = event.decode("utf-8")
+                key = channel[len(channel_prefix) :]
+                if event == "expire":
+                    # Only the TTL changed, the value is still the same
+                    continue
+                if event == "set" and self._cache.consume_own_write(key):
+                    continue
+                self._cache.invalidate(key)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
 
     async def close(self):
         """Close the underlying connection
 
-        This function will wait until all of remaining process has been executed
-        and then set it to stopping mode, halting any new function call.
+        This function will flush all pending coalesced writes, wait until all of
+        remaining process has been executed and then set it to stopping mode,
+        halting any new function call.
         """
-        self.logger.info(f"Closing connection, waiting for {len(self._need_execution)} tasks...")
-        timeout_delta = 10
-        current_timeout = 0
-        while len(self._need_execution) > 0:
-            await asyncio.sleep(0.2)
-            if len(self._need_execution) < 1:
-                break
-            if current_timeout > timeout_delta:
-                self.logger.info("Timeout after waiting for 10 seconds, shutting down anyway...")
-                break
-            current_timeout += 0.2
+        if self._pending_writes or self._flush_tasks:
+            self.logger.info(f"Flushing {len(self._pending_writes)} pending writes...")
+            await self.flush()
+        self.logger.info(f"Closing connection, waiting for {self._in_flight} tasks...")
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=10.0)
+        except asyncio.TimeoutError:
+            self.logger.info("Timeout after waiting for 10 seconds, shutting down anyway...")
         self._is_stopping = True
+        if self._cache_listener is not None:
+            self._cache_listener.cancel()
+            try:
+                await self._cache_listener
+            except asyncio.CancelledError:
+                pass
+            self._cache_listener = None
         self.logger.info("All tasks executed, closing connection!")
         await self._conn.close()
         await self._pool.disconnect()
@@ -186,68 +568,134 @@ class RedisBridge:
         """
         if self._is_stopping:
             return None
-        uniq_id = str(uuid.uuid4())
-        self.lock("get_" + uniq_id)
+        unflushed = self._unflushed_write(key)
+        if unflushed is not None:
+            return self.to_original(unflushed)
+        if self._cache is not None:
+            cached = self._cache.get(key)
+            if cached is not _NOT_CACHED:
+                if cached is None:
+                    return fallback
+                return self.to_original(cached)
+        self.lock()
+        read_generation = None
+        if self._cache is not None:
+            read_generation = self._cache.begin_read(key)
+        is_read = False
+        res = None
         try:
             res = await self._conn.get(key)
-            self.unlock("get_" + uniq_id)
-            if res is None:
-                return fallback
-            res = self.to_original(res)
+            is_read = True
         except aioredis.RedisError:
-            res = fallback
-        self.unlock("get_" + uniq_id)
-        return res
+            pass
+        finally:
+            if read_generation is not None:
+                self._cache.end_read(key, read_generation, res, is_read)
+            self.unlock()
+        if res is None:
+            return fallback
+        return self.to_original(res)
+
+    async def _scan_pages(self, pattern: str, count: int = None) -> AsyncIterator[List[str]]:
+        if count is None:
+            count = self._chunk_size
+        cursor = 0
+        while True:
+            if self._is_stopping:
+                return
+            try:
+                cursor, page_keys = await self._conn.scan(cursor, match=pattern, count=count)
+            except aioredis.RedisError:
+                return
+            if page_keys:
+                yield [key.decode("utf-8") if isinstance(key, bytes) else key for key in page_keys]
+            if not cursor:
+                return
+
+    async def scan_iter(self, pattern: str, count: int = None) -> AsyncIterator[str]:
+        """Iterate all the keys that match the pattern using `SCAN`
+
+        Unlike `keys()` this does not block the Redis server while walking the keyspace,
+        the keys are fetched page by page while you iterate it.
+
+        Redis might return the same key more than once, please dedupe it yourself if needed.
+
+        :param pattern: The pattern of the key to find, using the glob-style patterns
+                        Refer more here: https://redis.io/commands/SCAN
+        :type pattern: str
+        :param count: The amount of keys Redis should walk per page, defaults to the bridge chunk size
+        :type count: int, optional
+        :return: An async iterator of the matching keys
+        :rtype: AsyncIterator[str]
+        """
+        if self._is_stopping:
+            return
+        self.lock()
+        try:
+            async for page_keys in self._scan_pages(pattern, count):
+                for key in page_keys:
+                    yield key
+        finally:
+            self.unlock()
 
     async def keys(self, pattern: str) -> List[str]:
         """Get a list of keys from the database
 
+        This use `SCAN` internally, so it will not block the Redis server.
+
         :param pattern: The pattern of the key to find, using the glob-style patterns
-                        Refer more here: https://redis.io/commands/KEYS
+                        Refer more here: https://redis.io/commands/SCAN
         :type pattern: str
         :return: The matching keys of the pattern
         :rtype: List[str]
         """
         if self._is_stopping:
             return []
-        uniq_id = str(uuid.uuid4())
-        self.lock("keys_" + uniq_id)
-        try:
-            all_keys = await self._conn.keys(pattern)
-        except aioredis.RedisError:
-            all_keys = []
-        self.unlock("keys_" + uniq_id)
-        if not isinstance(all_keys, list):
-            return []
-        all_keys = [key.decode("utf-8") for key in all_keys]
-        return all_keys
+        await self._flush_matching(pattern)
+        all_keys = {}
+        async for key in self.scan_iter(pattern):
+            all_keys[key] = None
+        return list(all_keys.keys())
 
-    async def getall(self, pattern: str) -> List[Any]:
+    async def _scan_values(self, pattern: str, chunk_size: int = None):
+        seen_keys = set()
+        async for page_keys in self._scan_pages(pattern, chunk_size):
+            page_keys = [key for key in page_keys if key not in seen_keys]
+            if not page_keys:
+                continue
+            seen_keys.update(page_keys)
+            page_values = await self._bulk_get(page_keys, chunk_size)
+            yield page_keys, page_values
+
+    async def getall(self, pattern: str, chunk_size: int = None) -> List[Any]:
         """Get all values that match the key pattern
 
+        The keys are streamed with `SCAN` and the values are fetched
+        in batches using `MGET` instead of one `GET` per key.
+
         Example return format: `["value_of_it", "another_value"]`
 
         :param pattern: The pattern of the keys to find, using the glob-style patterns
-                        Refer more here: https://redis.io/commands/KEYS
+                        Refer more here: https://redis.io/commands/SCAN
         :type pattern: str
+        :param chunk_size: The amount of keys per `SCAN`/`MGET` call, defaults to the bridge chunk size
+        :type chunk_size: int, optional
         :return: All values of the matches keys
         :rtype: List[Any]
         """
         if self._is_stopping:
             return []
-        uniq_id = str(uuid.uuid4())
-        all_keys = await self.keys(pattern)
-        if not isinstance(all_keys, list):
-            return []
-        self.lock("getall_" + uniq_id)
+        await self._flush_matching(pattern)
+        self.lock()
         all_values = []
-        for key in all_keys:
-            r_val = await self.get(key)
-            all_values.append(r_val)
-        self.unlock("getall_" + uniq_id)
+        try:
+            async for _, page_values in self._scan_values(pattern, chunk_size):
+                all_values.extend(page_values)
+        finally:
+            self.unlock()
         return all_values
 
-    async def getalldict(self, pattern: str) -> Dict[str, Any]:
+    async def getalldict(self, pattern: str, chunk_size: int = None) -> Dict[str, Any]:
         """Get all values (with the key of it) that match the key pattern
 
         This is the same as `getall()` but with dict format.
@@ -255,30 +703,32 @@ class RedisBridge:
         Example: `{"the_key_name": "value_of_it", "the_key_name2", "another_value"}`
 
         :param pattern: The pattern of the keys to find, using the glob-style patterns
-                        Refer more here: https://redis.io/commands/KEYS
+                        Refer more here: https://redis.io/commands/SCAN
         :type pattern: str
+        :param chunk_size: The amount of keys per `SCAN`/`MGET` call, defaults to the bridge chunk size
+        :type chunk_size: int, optional
         :return: A key-value dict, key is the key name, value is the data
         :rtype: Dict[str, Any]
         """
         if self._is_stopping:
             return {}
-        uniq_id = str(uuid.uuid4())
-        all_keys = await self.keys(pattern)
-        if not isinstance(all_keys, list):
-            return {}
-        self.lock("getalldict_" + uniq_id)
+        await self._flush_matching(pattern)
+        self.lock()
         key_val = {}
-        for key in all_keys:
-            r_val = await self.get(key)
-            if isinstance(key, bytes):
-                key = key.decode("utf-8")
-            key_val[key] = r_val
-        self.unlock("getalldict_" + uniq_id)
+        try:
+            async for page_keys, page_values in self._scan_values(pattern, chunk_size):
+                key_val.update(zip(page_keys, page_values))
+        finally:
+            self.unlock()
         return key_val
 
     async def set(self, key: str, data: Any) -> bool:
         """Set a new key with provided data
 
+        If the key match one of the write-behind prefix, the write is queued and
+        repeated call inside the window will be collapsed into the latest value.
+        Use `flush()` to write it immediately.
+
         :param key: key name to hold the data
         :type key: str
         :param data: the data itself
@@ -288,15 +738,152 @@ class RedisBridge:
         """
         if self._is_stopping:
             return False
-        uniq_id = str(uuid.uuid4())
-        self._need_execution.append("set_" + uniq_id)
+        stringified = self._encode_for(key, data)
+        window = self._write_behind_window(key)
+        if window is not None:
+            self._queue_write(key, stringified, window)
+            return True
+        self.lock()
+        if self._cache is not None:
+            self._cache.mark_own_write(key)
         try:
-            res = await self._conn.set(key, self.stringify(data))
+            res = await self._conn.set(key, stringified)
         except aioredis.RedisError:
             res = False
-        self._need_execution.remove("set_" + uniq_id)
+        finally:
+            self.unlock()
+        if self._cache is not None:
+            self._write_through(key, stringified, res)
         return res
 
+    def _write_behind_window(self, key: str) -> Optional[float]:
+        for prefix, window in self._write_behind:
+            if key.startswith(prefix):
+                return window
+        return None
+
+    def _queue_write(self, key: str, stringified: bytes, window: float):
+        pending = self._pending_writes.get(key)
+        if pending is not None:
+            # Collapse into the already scheduled write, keep the original deadline.
+            self._coalesced_writes += 1
+            self._pending_writes[key] = (stringified, pending[1])
+        else:
+            # Hold an in-flight slot until it's flushed, so `close()` will wait for it.
+            self.lock()
+            handle = self._loop.call_later(window, self._schedule_flush, key)
+            self._pending_writes[key] = (stringified, handle)
+        if self._cache is not None:
+            self._cache.put(key, stringified)
+
+    def _schedule_flush(self, key: str) -> asyncio.Task:
+        previous = self._flush_tasks.get(key)
+        task = self._loop.create_task(self._flush_key(key, previous), name=f"naoTimes.Redis: flush-{key}")
+        self._flush_tasks[key] = task
+        task.add_done_callback(functools.partial(self._untrack_flush, key))
+        return task
+
+    def _untrack_flush(self, key: str, task: asyncio.Task):
+        if self._flush_tasks.get(key) is task:
+            del self._flush_tasks[key]
+
+    async def _wait_flush(self, key: str):
+        """Wait for the running flush of a key, so the next command is sent after its SET"""
+        task = self._flush_tasks.get(key)
+        if task is not None:
+            # Dont cancel the flush if the caller got cancelled
+            await asyncio.shield(task)
+
+    def _unflushed_write(self, key: str) -> Optional[bytes]:
+        pending = self._pending_writes.get(key)
+        if pending is not None:
+            return pending[0]
+        return self._flushing_writes.get(key)
+
+    def _drop_pending_write(self, key: str):
+        # The running flush is superseded too, dont serve it anymore
+        self._flushing_writes.pop(key, None)
+        pending = self._pending_writes.pop(key, None)
+        if pending is None:
+            return
+        pending[1].cancel()
+        self.unlock()
+
+    async def _flush_key(self, key: str, previous: Optional[asyncio.Task] = None) -> bool:
+        previous_res = True
+        if previous is not None:
+            try:
+                previous_res = await previous
+            except Exception:
+                previous_res = False
+        pending = self._pending_writes.pop(key, None)
+        if pending is None:
+            # Already flushed or dropped
+            return previous_res
+        stringified, handle = pending
+        handle.cancel()
+        # A new `set()` while writing will queue a new write, but the current value is still readable.
+        self._flushing_writes[key] = stringified
+        if self._cache is not None:
+            self._cache.mark_own_write(key)
+        try:
+            res = await self._conn.set(key, stringified)
+        except aioredis.RedisError:
+            self.logger.exception(f"Failed to flush pending write of {key}")
+            res = False
+        finally:
+            if self._flushing_writes.get(key) is stringified:
+                del self._flushing_writes[key]
+            self.unlock()
+        if self._cache is not None and not res:
+            self._cache.consume_own_write(key)
+            self._cache.invalidate(key)
+        return bool(res)
+
+    @property
+    def pending_writes(self) -> int:
+        """The amount of keys that have a pending coalesced write"""
+        return len(self._pending_writes)
+
+    def write_behind_stats(self) -> Dict[str, Any]:
+        """Get the write-behind statistics"""
+        return {"pending": len(self._pending_writes), "coalesced": self._coalesced_writes}
+
+    async def flush(self, key: str = None) -> bool:
+        """Write the pending coalesced write of a key right now
+
+        :param key: The key to flush, flush every pending key if not provided
+        :type key: str, optional
+        :return: Is all of the flushed write success or not?
+        :rtype: bool
+        """
+        if key is not None:
+            if key not in self._pending_writes:
+                await self._wait_flush(key)
+                return True
+            return await self._schedule_flush(key)
+        all_keys = list(self._pending_writes.keys())
+        results = await asyncio.gather(*[self._schedule_flush(pending_key) for pending_key in all_keys])
+        # Including the flush that is started by the timer
+        await asyncio.gather(*list(self._flush_tasks.values()), return_exceptions=True)
+        return all(results)
+
+    async def _flush_matching(self, pattern: str):
+        matching = [key for key in self._pending_writes.keys() if fnmatchcase(key, pattern)]
+        for key in matching:
+            await self._schedule_flush(key)
+
+    def _invalidate_cached(self, key: str):
+        if self._cache is not None:
+            self._cache.invalidate(key)
+
+    def _write_through(self, key: str, stringified: bytes, success: bool, expires: int = None):
+        if success:
+            self._cache.put(key, stringified, expires)
+        else:
+            self._cache.consume_own_write(key)
+            self._cache.invalidate(key)
+
     async def setex(self, key: str, data: Any, expires: int) -> bool:
         """Set a new key with provided data BUT with additional expiration time
 
@@ -311,13 +898,21 @@ class RedisBridge:
         """
         if self._is_stopping:
             return False
-        uniq_id = str(uuid.uuid4())
-        self.lock("setex_" + uniq_id)
+        stringified = self._encode_for(key, data)
+        # This write supersede the pending one, but it must be sent after the running flush
+        self._drop_pending_write(key)
+        await self._wait_flush(key)
+        self.lock()
+        if self._cache is not None:
+            self._cache.mark_own_write(key)
         try:
-            res = await self._conn.setex(key, expires, self.stringify(data))
+            res = await self._conn.setex(key, expires, stringified)
         except aioredis.RedisError:
             res = False
-        self.unlock("setex_" + uniq_id)
+        finally:
+            self.unlock()
+        if self._cache is not None:
+            self._write_through(key, stringified, res, expires)
         return res
 
     async def exist(self, key: str) -> bool:
@@ -330,13 +925,15 @@ class RedisBridge:
         """
         if self._is_stopping:
             return False
-        uniq_id = str(uuid.uuid4())
-        self.lock("exists_" + uniq_id)
+        if self._unflushed_write(key) is not None:
+            return True
+        self.lock()
         try:
             res = await self._conn.exists(key)
         except aioredis.RedisError:
             res = 0
-        self.unlock("exists_" + uniq_id)
+        finally:
+            self.unlock()
         if res > 0:
             return True
         return False
@@ -353,16 +950,414 @@ class RedisBridge:
         """
         if self._is_stopping:
             return False
-        uniq_id = str(uuid.uuid4())
-        self.lock("rm_" + uniq_id)
+        self._drop_pending_write(key)
+        # The DEL must reach Redis after the running flush, or the key will come back
+        await self._wait_flush(key)
+        self.lock()
         try:
             res = await self._conn.delete(key)
         except aioredis.RedisError:
             res = 0
-        self.unlock("rm_" + uniq_id)
+        finally:
+            self.unlock()
+        if self._cache is not None:
+            # Whatever happened, the local copy is now stale
+            self._cache.invalidate(key)
         if res > 0:
             return True
         return False
 
     # Aliases
     delete = rm
+
+    # Pub/Sub
+
+    async def publish(self, channel: str, message: bytes) -> int:
+        """Publish a raw message to a channel
+
+        :param channel: The channel name
+        :type channel: str
+        :param message: The message to publish, this will not be encoded
+        :type message: bytes
+        :return: The amount of subscriber that received the message
+        :rtype: int
+        """
+        if self._is_stopping:
+            return 0
+        self.lock()
+        try:
+            res = await self._conn.publish(channel, message)
+        except aioredis.RedisError:
+            res = 0
+        finally:
+            self.unlock()
+        return res
+
+    def pubsub(self) -> "aioredis.client.PubSub":
+        """Create a new PubSub object, the caller need to close it by themselves"""
+        return self._conn.pubsub()
+
+    # Native data structures
+    # The member/value are encoded with the same codec as `set()`/`get()`.
+
+    async def sadd(self, key: str, *members: Any) -> int:
+        """Add members to a set
+
+        :param key: The key of the set
+        :type key: str
+        :return: The amount of new members added
+        :rtype: int
+        """
+        if self._is_stopping or not members:
+            return 0
+        encoded = [self.stringify(member) for member in members]
+        self.lock()
+        try:
+            res = await self._conn.sadd(key, *encoded)
+        except aioredis.RedisError:
+            res = 0
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        return res
+
+    async def srem(self, key: str, *members: Any) -> int:
+        """Remove members from a set
+
+        :param key: The key of the set
+        :type key: str
+        :return: The amount of members removed
+        :rtype: int
+        """
+        if self._is_stopping or not members:
+            return 0
+        encoded = [self.stringify(member) for member in members]
+        self.lock()
+        try:
+            res = await self._conn.srem(key, *encoded)
+        except aioredis.RedisError:
+            res = 0
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        return res
+
+    async def sismember(self, key: str, member: Any) -> bool:
+        """Check if a member is part of a set
+
+        :param key: The key of the set
+        :type key: str
+        :param member: The member to check
+        :type member: Any
+        :return: Is the member exist on the set or not?
+        :rtype: bool
+        """
+        if self._is_stopping:
+            return False
+        self.lock()
+        try:
+            res = await self._conn.sismember(key, self.stringify(member))
+        except aioredis.RedisError:
+            res = 0
+        finally:
+            self.unlock()
+        return bool(res)
+
+    async def smembers(self, key: str) -> Set[Any]:
+        """Get all members of a set
+
+        The members must be hashable after being decoded (str, int, bytes)
+
+        :param key: The key of the set
+        :type key: str
+        :return: All members of the set
+        :rtype: Set[Any]
+        """
+        if self._is_stopping:
+            return set()
+        self.lock()
+        try:
+            res = await self._conn.smembers(key)
+        except aioredis.RedisError:
+            res = []
+        finally:
+            self.unlock()
+        return set(map(self.to_original, res))
+
+    async def hset(self, key: str, field: str, data: Any) -> bool:
+        """Set a field of a hash
+
+        :param key: The key of the hash
+        :type key: str
+        :param field: The field name
+        :type field: str
+        :param data: The data itself
+        :type data: Any
+        :return: is the execution success or no?
+        :rtype: bool
+        """
+        if self._is_stopping:
+            return False
+        stringified = self._encode_for(key, data)
+        self.lock()
+        try:
+            await self._conn.hset(key, str(field), stringified)
+            res = True
+        except aioredis.RedisError:
+            res = False
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        return res
+
+    async def hget(self, key: str, field: str, fallback: Any = None) -> Any:
+        """Get a field of a hash
+
+        :param key: The key of the hash
+        :type key: str
+        :param field: The field name
+        :type field: str
+        :return: The value of the field, might be `NoneType`
+        :rtype: Any
+        """
+        if self._is_stopping:
+            return None
+        self.lock()
+        try:
+            res = await self._conn.hget(key, str(field))
+        except aioredis.RedisError:
+            res = None
+        finally:
+            self.unlock()
+        if res is None:
+            return fallback
+        return self.to_original(res)
+
+    async def hgetall(self, key: str) -> Dict[str, Any]:
+        """Get all fields of a hash
+
+        :param key: The key of the hash
+        :type key: str
+        :return: A field-value dict
+        :rtype: Dict[str, Any]
+        """
+        if self._is_stopping:
+            return {}
+        self.lock()
+        try:
+            res = await self._conn.hgetall(key)
+        except aioredis.RedisError:
+            res = {}
+        finally:
+            self.unlock()
+        return {
+            field.decode("utf-8") if isinstance(field, bytes) else field: self.to_original(value)
+            for field, value in res.items()
+        }
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        """Remove fields from a hash
+
+        :param key: The key of the hash
+        :type key: str
+        :return: The amount of fields removed
+        :rtype: int
+        """
+        if self._is_stopping or not fields:
+            return 0
+        self.lock()
+        try:
+            res = await self._conn.hdel(key, *[str(field) for field in fields])
+        except aioredis.RedisError:
+            res = 0
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        return res
+
+    async def hupdate(
+        self, key: str, mapping: Optional[Dict[str, Any]] = None, remove: Optional[List[str]] = None
+    ) -> bool:
+        """Set and remove multiple fields of a hash in a single transaction
+
+        :param key: The key of the hash
+        :type key: str
+        :param mapping: A field-value dict to be set
+        :type mapping: Optional[Dict[str, Any]], optional
+        :param remove: The fields to be removed
+        :type remove: Optional[List[str]], optional
+        :return: is the execution success or no?
+        :rtype: bool
+        """
+        if self._is_stopping:
+            return False
+        if not mapping and not remove:
+            return True
+        encoded = {str(field): self._encode_for(key, data) for field, data in (mapping or {}).items()}
+        self.lock()
+        try:
+            async with self._conn.pipeline(transaction=True) as pipe:
+                if remove:
+                    pipe.hdel(key, *[str(field) for field in remove])
+                if encoded:
+                    pipe.hset(key, mapping=encoded)
+                await pipe.execute()
+            res = True
+        except aioredis.RedisError:
+            res = False
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        return res
+
+    async def zadd(self, key: str, mapping: Dict[Any, float]) -> int:
+        """Add members with their score to a sorted set
+
+        :param key: The key of the sorted set
+        :type key: str
+        :param mapping: A member-score dict
+        :type mapping: Dict[Any, float]
+        :return: The amount of new members added
+        :rtype: int
+        """
+        if self._is_stopping or not mapping:
+            return 0
+        encoded = {self.stringify(member): score for member, score in mapping.items()}
+        self.lock()
+        try:
+            res = await self._conn.zadd(key, encoded)
+        except aioredis.RedisError:
+            res = 0
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        return res
+
+    async def zrangebyscore(
+        self,
+        key: str,
+        min: Union[float, str],
+        max: Union[float, str],
+        start: int = None,
+        num: int = None,
+        withscores: bool = False,
+    ) -> List[Any]:
+        """Get the members of a sorted set with score between `min` and `max`
+
+        :param key: The key of the sorted set
+        :type key: str
+        :param min: The minimum score, use `-inf` for no limit
+        :type min: Union[float, str]
+        :param max: The maximum score, use `+inf` for no limit
+        :type max: Union[float, str]
+        :param start: The offset for the pagination, must be used with `num`
+        :type start: int, optional
+        :param num: The amount of members for the pagination, must be used with `start`
+        :type num: int, optional
+        :param withscores: Return a list of member-score tuple instead
+        :type withscores: bool, optional
+        :return: The members, sorted by the score
+        :rtype: List[Any]
+        """
+        if self._is_stopping:
+            return []
+        self.lock()
+        try:
+            res = await self._conn.zrangebyscore(key, min, max, start=start, num=num, withscores=withscores)
+        except aioredis.RedisError:
+            res = []
+        finally:
+            self.unlock()
+        if withscores:
+            return [(self.to_original(member), score) for member, score in res]
+        return list(map(self.to_original, res))
+
+    async def _get_list_for_migration(self, key: str) -> Optional[list]:
+        try:
+            key_type = await self._conn.type(key)
+        except aioredis.RedisError:
+            return None
+        if isinstance(key_type, bytes):
+            key_type = key_type.decode("utf-8")
+        if key_type != "string":
+            # Already migrated or does not exist
+            return None
+        try:
+            data = self.to_original(await self._conn.get(key))
+        except aioredis.RedisError:
+            return None
+        if not isinstance(data, list):
+            return None
+        return data
+
+    async def migrate_list_to_set(self, key: str) -> bool:
+        """Convert an old JSON list key into a native Redis set, in place
+
+        This is safe to be called multiple times, a key that is not a JSON list
+        will be left untouched.
+
+        :param key: The key to migrate
+        :type key: str
+        :return: Is the key migrated or not?
+        :rtype: bool
+        """
+        if self._is_stopping:
+            return False
+        self.lock()
+        try:
+            old_data = await self._get_list_for_migration(key)
+            if old_data is None:
+                return False
+            members = [self.stringify(member) for member in old_data]
+            async with self._conn.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                if members:
+                    pipe.sadd(key, *members)
+                await pipe.execute()
+        except aioredis.RedisError:
+            self.logger.exception(f"Failed to migrate {key} into a set")
+            return False
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        self.logger.info(f"Migrated {key} into a set with {len(old_data)} members")
+        return True
+
+    async def migrate_list_to_hash(self, key: str, field_key: str) -> bool:
+        """Convert an old JSON list of dict key into a native Redis hash, in place
+
+        Each dict will be stored with the value of `field_key` as the field name.
+        This is safe to be called multiple times, a key that is not a JSON list
+        will be left untouched.
+
+        :param key: The key to migrate
+        :type key: str
+        :param field_key: The dict key that will be used as the hash field
+        :type field_key: str
+        :return: Is the key migrated or not?
+        :rtype: bool
+        """
+        if self._is_stopping:
+            return False
+        self.lock()
+        try:
+            old_data = await self._get_list_for_migration(key)
+            if old_data is None:
+                return False
+            mapping = {}
+            for data in old_data:
+                if isinstance(data, dict) and field_key in data:
+                    mapping[str(data[field_key])] = self._encode_for(key, data)
+            async with self._conn.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                if mapping:
+                    pipe.hset(key, mapping=mapping)
+                await pipe.execute()
+        except aioredis.RedisError:
+            self.logger.exception(f"Failed to migrate {key} into a hash")
+            return False
+        finally:
+            self.unlock()
+        self._invalidate_cached(key)
+        self.logger.info(f"Migrated {key} into a hash with {len(mapping)} fields")
+        return True
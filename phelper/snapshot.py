@@ -0,0 +1,184 @@
+import asyncio
+import copy
+import logging
+import time
+from abc import ABC, abstractmethod
+from types import MappingProxyType
+from typing import Any, Dict, NamedTuple, Optional
+
+from .poller import HTTPPoller
+
+__all__ = [
+    "Snapshot",
+    "SnapshotSource",
+    "HTTPSnapshotSource",
+    "FixtureSnapshotSource",
+    "SnapshotFeed",
+    "freeze",
+]
+
+
+def freeze(data: Any) -> Any:
+    """Make a read-only copy of a parsed JSON, dict become a mapping proxy and list become a tuple"""
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(value) for value in data)
+    return data
+
+
+class Snapshot(NamedTuple):
+    version: int
+    # The frozen data, see `freeze()`
+    data: Any
+    fetched_at: float
+
+
+class SnapshotSource(ABC):
+    """The source of a :class:`SnapshotFeed`"""
+
+    @abstractmethod
+    async def fetch(self) -> Optional[Any]:
+        """Fetch the newest data, return `None` if it's unchanged since the last fetch"""
+
+    def reset(self):
+        """Forget the last fetch, so the next fetch will return the data even if it's unchanged"""
+
+
+class HTTPSnapshotSource(SnapshotSource):
+    def __init__(self, poller: HTTPPoller, url: str, key: Optional[str] = None):
+        self._poller = poller
+        self._url = url
+        self._key = key or url
+
+    async def fetch(self) -> Optional[Any]:
+        result = await self._poller.poll_json(self._url, self._key)
+        if not result.changed:
+            return None
+        return result.data
+
+    def reset(self):
+        self._poller.forget(self._key)
+
+
+class FixtureSnapshotSource(SnapshotSource):
+    """An in-memory source, use `set()` to publish a new data"""
+
+    def __init__(self, data: Any):
+        self._data = data
+        self._pending = True
+
+    def set(self, data: Any):
+        self._data = data
+        self._pending = True
+
+    async def fetch(self) -> Optional[Any]:
+        if not self._pending:
+            return None
+        self._pending = False
+        # The caller must not be able to change the fixture itself
+        return copy.deepcopy(self._data)
+
+    def reset(self):
+        self._pending = True
+
+
+class SnapshotFeed:
+    """Fetch a source once every `interval` and share the newest snapshot to every subscriber
+
+    Subscribers run on their own schedule and call :meth:`latest` with their own name,
+    it return `None` if the subscriber already received the newest snapshot.
+
+    :param name: The name of the feed, used for logging
+    :type name: str
+    :param source: The data source
+    :type source: SnapshotSource
+    :param interval: How often to fetch the source, in seconds
+    :type interval: float
+    :param loop: The event loop
+    :type loop: asyncio.AbstractEventLoop, optional
+    """
+
+    def __init__(
+        self, name: str, source: SnapshotSource, interval: float, loop: asyncio.AbstractEventLoop = None
+    ):
+        self.logger = logging.getLogger(f"Potia.SnapshotFeed.{name}")
+        self.name = name
+        self._source = source
+        self._interval = interval
+        self._loop = loop or asyncio.get_event_loop()
+        self._latest: Optional[Snapshot] = None
+        self._version = 0
+        self._seen: Dict[str, int] = {}
+        self._first_snapshot = asyncio.Event()
+        self._refresh = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        return self._latest
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._runner(), name=f"PotiaSnapshotFeed: {self.name}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def set_source(self, source: SnapshotSource):
+        """Change the source and fetch it right away"""
+        source.reset()
+        self._source = source
+        self._refresh.set()
+
+    async def _runner(self):
+        while True:
+            self._refresh.clear()
+            try:
+                data = await self._source.fetch()
+                if data is not None:
+                    self._publish(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Failed to fetch the source: {e!r}")
+            try:
+                await asyncio.wait_for(self._refresh.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _publish(self, data: Any):
+        self._version += 1
+        self._latest = Snapshot(self._version, freeze(data), time.time())
+        self._first_snapshot.set()
+        self.logger.info(f"Published snapshot v{self._version}")
+
+    async def wait_ready(self, timeout: float = 30.0) -> bool:
+        """Wait for the first snapshot, return `False` if it's not available after `timeout`"""
+        try:
+            await asyncio.wait_for(self._first_snapshot.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def latest(self, subscriber: str) -> Optional[Snapshot]:
+        """Get the newest snapshot if `subscriber` has not received it yet"""
+        snapshot = self._latest
+        if snapshot is None or self._seen.get(subscriber) == snapshot.version:
+            return None
+        self._seen[subscriber] = snapshot.version
+        return snapshot
+
+    def forget(self, subscriber: str):
+        """Give the newest snapshot again to `subscriber` on the next `latest()` call
+
+        Use this if the subscriber failed to fully process the snapshot.
+        """
+        self._seen.pop(subscriber, None)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from discord.ext import commands, tasks
+
+__all__ = ["ExtensionTiming", "StartupReport"]
+
+
+class ExtensionTiming:
+    """The startup durations of a single extension, in seconds"""
+
+    __slots__ = ("name", "setup", "init", "failed")
+
+    def __init__(self, name: str):
+        self.name = name
+        # Executing the extension module and the `setup()` function
+        self.setup = 0.0
+        # The `tasks.loop(count=1)` initializers, counted since the bot is ready
+        self.init: Optional[float] = None
+        self.failed = False
+
+    @property
+    def total(self) -> float:
+        return self.setup + (self.init or 0.0)
+
+
+class StartupReport:
+    """Load the extensions and record how long each extension took to be ready"""
+
+    def __init__(self):
+        self.logger = logging.getLogger("Potia.StartupReport")
+        self._started_at = time.perf_counter()
+        self._ready_at: Optional[float] = None
+        self._operational_at: Optional[float] = None
+        self.extensions: Dict[str, ExtensionTiming] = {}
+        self._init_tasks: Dict[asyncio.Task, str] = {}
+
+    def load(self, bot: commands.Bot, name: str):
+        """Load an extension and start tracking the initializers of the cogs it added"""
+        timing = self.extensions.setdefault(name, ExtensionTiming(name))
+        start = time.perf_counter()
+        try:
+            bot.load_extension(name)
+        except Exception:
+            timing.failed = True
+            raise
+        finally:
+            timing.setup = time.perf_counter() - start
+        for cog in bot.cogs.values():
+            if cog.__module__ != name:
+                continue
+            for value in vars(cog).values():
+                if not isinstance(value, tasks.Loop) or value.count != 1:
+                    continue
+                task = value.get_task()
+                if task is not None and not task.done():
+                    self._init_tasks[task] = name
+                    task.add_done_callback(self._init_finished)
+
+    def _init_finished(self, task: asyncio.Task):
+        name = self._init_tasks.get(task)
+        if name is None:
+            return
+        finished = time.perf_counter() - (self._ready_at or self._started_at)
+        timing = self.extensions[name]
+        timing.init = max(timing.init or 0.0, finished)
+
+    def mark_ready(self):
+        if self._ready_at is None:
+            self._ready_at = time.perf_counter()
+
+    @property
+    def is_complete(self) -> bool:
+        return self._operational_at is not None
+
+    async def wait_initialized(self, timeout: float = 60.0):
+        """Wait for every tracked initializer to finish, then mark the bot as fully operational"""
+        pending = [task for task in self._init_tasks.keys() if not task.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        self._operational_at = time.perf_counter()
+
+    def format_table(self) -> str:
+        """Format the timing of every extension, slowest first"""
+        lines = [f"{'extension':<28} {'setup':>8} {'init':>8} {'total':>8}"]
+        ordered = sorted(self.extensions.values(), key=lambda x: x.total, reverse=True)
+        for timing in ordered:
+            init = "-" if timing.init is None else f"{timing.init * 1000:.0f}"
+            name = timing.name[5:] if timing.name.startswith("cogs.") else timing.name
+            if timing.failed:
+                name += " (!)"
+            lines.append(f"{name:<28} {timing.setup * 1000:>8.0f} {init:>8} {timing.total * 1000:>8.0f}")
+        lines.append("(in ms, init is counted since the bot is ready)")
+        if self._ready_at is not None:
+            lines.append(f"Start to ready: {self._ready_at - self._started_at:.2f}s")
+        if self._operational_at is not None:
+            lines.append(f"Start to fully operational: {self._operational_at - self._started_at:.2f}s")
+        return "\n".join(lines)
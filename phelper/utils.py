@@ -25,6 +25,27 @@ def sync_wrap(func):
     return run
 
 
+async def bounded_gather(*aws: T.Awaitable, limit: int = 4, return_exceptions: bool = False) -> list:
+    """Run the awaitables concurrently with at most `limit` of them running at the same time.
+
+    :param aws: the awaitables to run
+    :type aws: Awaitable
+    :param limit: the maximum number of awaitables running at once, defaults to 4
+    :type limit: int, optional
+    :param return_exceptions: return the exception as the result instead of raising it, defaults to False
+    :type return_exceptions: bool, optional
+    :return: the results, in the same order as `aws`
+    :rtype: list
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _bounded(aw: T.Awaitable):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*[_bounded(aw) for aw in aws], return_exceptions=return_exceptions)
+
+
 def get_indexed(data: list, n: int):
     try:
         return data[n]
@@ -144,56 +165,69 @@ def explode_filepath_into_pieces(filepath: str) -> T.List[str]:
     return filepath
 
 
-def prefixes_with_data(
-    bot,
-    context: T.Union[discord.Message, discord.TextChannel, discord.Guild, commands.Context],
-    prefixes_data: dict,
-    default: str,
-) -> list:
-    """
-    A modified version of discord.ext.command.when_mentioned_or
+class PrefixTable:
+    """A precomputed prefixes of every guild, used as the bot `command_prefix`
+
+    A modified version of discord.ext.command.when_mentioned_or, every guild prefixes is
+    an immutable tuple built once and updated in place with `set()` or `remove()`,
+    so resolving the prefix of a message is a single dict lookup.
+
+    :param default: The default prefix
+    :type default: str
+    :param prefixes_data: The custom prefix of a guild, keyed by the guild ID
+    :type prefixes_data: dict
     """
-    pre_data = []
-    pre_data.append(default)
-
-    guild: discord.Guild = None
-    if isinstance(context, (discord.Message, discord.TextChannel)):
-        if hasattr(context, "guild"):
-            try:
-                guild = context.guild
-            except AttributeError:
-                pass
-    elif isinstance(context, discord.Guild):
-        guild = context
-    elif isinstance(context, commands.Context):
-        if hasattr(context, "guild"):
-            try:
-                guild = context.guild
-            except AttributeError:
-                pass
-        elif hasattr(context, "message"):
-            try:
-                if hasattr(context.message, "guild"):
-                    guild = context.message.guild
-            except AttributeError:
-                pass
-    elif hasattr(context, "guild"):
-        guild = context.guild
-    elif hasattr(context, "message"):
-        msg = context.message
-        if hasattr(msg, "guild"):
-            guild = msg.guild
-
-    if guild is not None and hasattr(guild, "id"):
-        srv_pre = prefixes_data.get(str(guild.id))
-        if srv_pre:
-            pre_data.remove(default)
-            pre_data.append(srv_pre)
-    if "ntd." not in pre_data:
-        pre_data.append("ntd.")
-    pre_data.extend([bot.user.mention + " ", "<@!%s> " % bot.user.id])
-
-    return pre_data
+
+    __slots__ = ("_default", "_custom", "_guilds", "_default_prefixes", "_mentions")
+
+    def __init__(self, default: str, prefixes_data: T.Dict[T.Union[str, int], str] = None):
+        self._default = default
+        self._custom: T.Dict[int, str] = {}
+        for guild_id, prefix in (prefixes_data or {}).items():
+            if prefix:
+                self._custom[int(guild_id)] = prefix
+        self._mentions: T.Tuple[str, ...] = ()
+        self._guilds: T.Dict[int, T.Tuple[str, ...]] = {}
+        self._default_prefixes: T.Tuple[str, ...] = ()
+        self._rebuild()
+
+    def _build(self, prefix: str) -> T.Tuple[str, ...]:
+        if prefix == "ntd.":
+            return (prefix,) + self._mentions
+        return (prefix, "ntd.") + self._mentions
+
+    def _rebuild(self):
+        self._default_prefixes = self._build(self._default)
+        self._guilds = {guild_id: self._build(prefix) for guild_id, prefix in self._custom.items()}
+
+    def bind_user(self, user: T.Optional[discord.abc.User]):
+        """Add the bot mention as a prefix, called once the bot is ready"""
+        if user is None:
+            return
+        self._mentions = (user.mention + " ", "<@!%s> " % user.id)
+        self._rebuild()
+
+    def set(self, guild_id: int, prefix: str):
+        self._custom[int(guild_id)] = prefix
+        self._guilds[int(guild_id)] = self._build(prefix)
+
+    def remove(self, guild_id: int):
+        self._custom.pop(int(guild_id), None)
+        self._guilds.pop(int(guild_id), None)
+
+    def get(self, guild_id: T.Optional[int]) -> T.Tuple[str, ...]:
+        if guild_id is None:
+            return self._default_prefixes
+        return self._guilds.get(guild_id, self._default_prefixes)
+
+    def __call__(self, bot: commands.Bot, message: discord.Message) -> T.Tuple[str, ...]:
+        if not self._mentions:
+            # Bot is not ready yet when the table is created
+            self.bind_user(bot.user)
+        guild = getattr(message, "guild", None)
+        if guild is None:
+            return self._default_prefixes
+        return self._guilds.get(guild.id, self._default_prefixes)
 
 
 # Message utils